@@ -70,6 +70,7 @@ THE_TESTS = (# Indexer and Subclasses
              test_dissonance.DISSONANCE_INDEXER_SUITE,
              test_dissonance.SUSPENSION_INDEXER_SUITE,
              test_metre.BEATSTRENGTH_INDEXER_SUITE,
+             test_metre.TIME_SIGNATURE_INDEXER_SUITE,
              # Experimenter and Subclasses
              test_frequency_experimenter.FREQUENCY_FUNC_SUITE,
              test_frequency_experimenter.FREQUENCY_RUN_SUITE,
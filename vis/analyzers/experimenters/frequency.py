@@ -28,6 +28,7 @@
 Experimenters that deal with the frequencies (number of occurrences) of events.
 """
 
+from collections import Counter
 import pandas
 from vis.analyzers import experimenter
 
@@ -44,11 +45,8 @@ def experimenter_func(obj):
         The first element is the first element given here, used for identification purposes.
     :rtype: :obj:`tuple` of (anything, :class:`pandas.Series`)
     """
-    thing_dict = {}
-    for each in obj[1]:
-        if each not in thing_dict:
-            thing_dict[each] = sum(obj[1] == each)
-    return obj[0], pandas.Series(thing_dict)
+    # NB: NaN never compares equal to itself, so it would never have been counted anyway
+    return obj[0], pandas.Series(Counter(obj[1].dropna()))
 
 
 class FrequencyExperimenter(experimenter.Experimenter):
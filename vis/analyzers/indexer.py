@@ -30,7 +30,11 @@ The controllers that deal with indexing data from music21 Score objects.
 """
 
 import pandas
-from music21 import stream, converter
+from music21 import common, stream, converter
+
+
+# Used by flat_events() to find its results in the music21 cache of a Stream.
+_FLAT_EVENTS_KEY = u'vis.flat_events'
 
 
 def mpi_unique_offsets(streams):
@@ -49,6 +53,78 @@ def mpi_unique_offsets(streams):
     return sorted(set.union(*offsets))  # pylint: disable=W0142
 
 
+def flat_events(part, types=None):
+    """
+    Flatten a :class:`Stream` and keep only objects of some types. Used by :meth:`stream_indexer`.
+
+    The result is remembered in the :class:`Stream`, so that running several indexers on the
+    same :class:`Part` flattens it only once. music21 forgets its own ``flat`` representation as
+    soon as that :class:`Stream` is sorted, so we keep the result in the same cache, which
+    music21 empties whenever the contents of the :class:`Stream` change.
+
+    :param part: The :class:`Stream` to flatten.
+    :type part: :class:`music21.stream.Stream`
+    :param types: Only objects of a type in this list will be kept. If ``None``, every object
+        is kept.
+    :type types: list of type
+
+    :returns: The flattened :class:`Stream`.
+    :rtype: :class:`music21.stream.Stream`
+    """
+    # pylint: disable=protected-access
+    key = (_FLAT_EVENTS_KEY, None if types is None else tuple(types))
+    try:
+        return part._cache[key]
+    except KeyError:
+        if types is None:
+            post = part.flat
+            post.sort()  # this empties the cache, so we must do it first
+        else:
+            post = flat_events(part).getElementsByClass(types)
+        part._cache[key] = post
+        return post
+
+
+def first_events_at(part, offsets):
+    """
+    For each of some offsets, find the first object in a :class:`Stream` that is happening at
+    that offset. Used by :meth:`stream_indexer`.
+
+    This gives the same results as taking the first object from
+    ``part.getElementsByOffset(offset, mustBeginInSpan=False)`` for every offset, but that method
+    searches the whole :class:`Stream` each time. Instead, we go through the :class:`Stream` once,
+    keeping track of which objects are still sounding.
+
+    :param part: The :class:`Stream` in which to find objects.
+    :type part: :class:`music21.stream.Stream`
+    :param offsets: The offsets at which to find an object, sorted from lowest to highest.
+    :type offsets: list of float
+
+    :returns: For each offset, the first object that begins at or before it and has not finished
+        by it (or a zero-length object at exactly that offset), or ``None`` if there is none.
+    :rtype: list of :class:`music21.base.Music21Object` or ``None``
+    """
+    elements = part.elements
+    starts = []
+    ends = []
+    for each in elements:
+        start = each.getOffsetBySite(part)
+        starts.append(common.cleanupFloat(start))
+        ends.append(common.cleanupFloat(start + each.duration.quarterLength))
+
+    post = []
+    sounding = []  # indices into "elements" of objects that started at or before this offset
+    next_elem = 0
+    for off in offsets:
+        while next_elem < len(elements) and starts[next_elem] <= off:
+            sounding.append(next_elem)
+            next_elem += 1
+        # remove objects that finished; zero-length objects only count at their own offset
+        sounding = [i for i in sounding if ends[i] > off or (starts[i] == ends[i] == off)]
+        post.append(elements[sounding[0]] if sounding else None)
+    return post
+
+
 def stream_indexer(pipe_index, parts, indexer_func, types=None):
     """
     Perform the indexation of a :class:`Part` or :class:`Part` combination. This is a module-level
@@ -79,41 +155,30 @@ def stream_indexer(pipe_index, parts, indexer_func, types=None):
     :rtype: 2-tuple of object and :class:`pandas.Series`
     """
     # NB: It's hard to tell, but this function is based on music21.stream.Stream.chordify()
-    # NB2: This must not be a single-line if/else statement, or the getter() call will fail.
-    if types is None:
-        getter = lambda thing: thing
-    else:
-        getter = lambda thing: thing.getElementsByClass(types)
-
     # Convert "frozen" Streams, if needed; flatten the streams and filter classes
     if isinstance(parts[0], basestring):
-        all_parts = [getter(converter.thaw(each).flat) for each in parts]
+        all_parts = [flat_events(converter.thaw(each), types) for each in parts]
     else:
-        all_parts = [getter(part.flat) for part in parts]
+        all_parts = [flat_events(part, types) for part in parts]
 
     # collect all unique offsets
     unique_offsets = mpi_unique_offsets(all_parts)
 
-    # in cases where there will be more than one event at an offset, we need this
-    offsets_for_series = []
+    # find the event happening at every offset in each part
+    part_events = [first_events_at(part, unique_offsets) for part in all_parts]
 
-    # Convert to requested index format
+    # Convert to requested index format; there is exactly one simultaneity at each offset
     new_series_data = []
-    for off in unique_offsets:
+    for i, off in enumerate(unique_offsets):
         # inspired by vis.controllers.analyzer._event_finder() in vis9c
         current_events = []
-        for part in all_parts:  # find the events happening at this offset in all parts
-            current_events.append(list(part.getElementsByOffset(off, mustBeginInSpan=False)))
-
-        # Arrange groups of things to index
-        current_events = [[event[0] for event in current_events]]
+        for events in part_events:
+            if events[i] is None:
+                raise IndexError(u'No event at offset %s.' % off)
+            current_events.append(events[i])
+        new_series_data.append(indexer_func(current_events))
 
-        # Index previously-arranged groups
-        for each_simul in current_events:
-            new_series_data.append(indexer_func(each_simul))
-            offsets_for_series.append(off)
-
-    return pipe_index, pandas.Series(new_series_data, index=offsets_for_series)
+    return pipe_index, pandas.Series(new_series_data, index=unique_offsets)
 
 
 def series_indexer(pipe_index, parts, indexer_func):
@@ -359,10 +424,12 @@ class Indexer(object):
                 post.append(series_indexer(0, voices, self._indexer_func)[1])
         return post
 
-    def make_return(self, labels, indices):
+    @classmethod
+    def make_return(cls, labels, indices):
         """
         Prepare a properly-formatted :class:`DataFrame` as should be returned by any :class:`Indexer`
-        subclass. We intend for this to be called by :class:`Indexer` subclasses only.
+        subclass. We intend for this to be called by :class:`Indexer` subclasses only. This only
+        needs the class, so an indexer may also label results in the format of another indexer.
 
         The index of a label in ``labels`` should be the same as the index of the :class:`Series`
         to which it corresponds in ``indices``. For example, if ``indices[12]`` is the tuba part,
@@ -383,11 +450,18 @@ class Indexer(object):
         if len(labels) != len(indices):
             raise IndexError(Indexer._MAKE_RETURN_INDEX_ERR)
         # make the indexer's name using filename and classname (but not full class name)
-        my_mod = unicode(self.__module__)[unicode(self.__module__).rfind(u'.') + 1:]
-        my_class = unicode(self.__class__)[unicode(self.__class__).rfind(u'.'):-2]
+        my_mod = unicode(cls.__module__)[unicode(cls.__module__).rfind(u'.') + 1:]
+        my_class = unicode(cls)[unicode(cls).rfind(u'.'):-2]
         my_name = my_mod + my_class
         # make the MultiIndex and its labels
-        tuples = [(my_name, labels[i]) for i in xrange(len(labels))]
-        multiindex = pandas.MultiIndex.from_tuples(tuples, names=['Indexer', 'Parts'])
-        # foist our MultiIndex onto the new results
-        return pandas.DataFrame(indices, index=multiindex).T
+        multiindex = pandas.MultiIndex.from_arrays([[my_name] * len(labels), labels],
+                                                   names=['Indexer', 'Parts'])
+        if (len(set(labels)) < len(labels) or
+                not all(isinstance(each, pandas.Series) for each in indices)):
+            # foist our MultiIndex onto the new results
+            return pandas.DataFrame(indices, index=multiindex).T
+        # Put each result in a column directly, which is much faster than making a row of each
+        # and transposing the whole DataFrame.
+        post = pandas.DataFrame(dict(zip(labels, indices)), columns=labels)
+        post.columns = multiindex
+        return post
@@ -33,9 +33,9 @@ same part.
 # disable "string statement has no effect"... it's for sphinx
 # pylint: disable=W0105
 
-from numpy import isnan
+from numpy import column_stack, empty, isnan, mod, triu_indices, unique, where
 import pandas
-from music21 import note, interval, pitch
+from music21 import interval, pitch
 from vis.analyzers import indexer
 
 
@@ -61,6 +61,10 @@ def key_to_tuple(key):
     return int(post[0]), int(post[1])
 
 
+# Used by interval_to_int() to remember the integer corresponding to each interval string.
+_INTERVAL_TO_INT = {}
+
+
 def interval_to_int(interv, nan_is=1):
     """
     Convert a simple interval in a string to an integer. This basically drops the quality, maintains
@@ -74,6 +78,8 @@ def interval_to_int(interv, nan_is=1):
     :returns: An integer representation of the interval **or** the string ``'Rest'``.
     :rtype: int or string
 
+    :raises: :exc:`TypeError` if ``interv`` is neither a string nor :obj:`numpy.nan`.
+
     >>> interval_to_int('M3')
     3
     >>> interval_to_int('3')
@@ -90,19 +96,67 @@ def interval_to_int(interv, nan_is=1):
     42
     """
     # NOTE: so far this is only used by the dissonance.SuspensionIndexer, but it belongs here
-    # NOTE: the first branch eliminates rests; we can't *just* use ('Rest' == interv) because
-    #       the function sometimes receives "t" from the SuspensionIndexer.
-    if isinstance(interv, basestring) and interv.endswith('t'):
-        return 'Rest'
-    elif not isinstance(interv, basestring) and isnan(interv):
+    # NOTE: the dissonance indexers call this several times per offset with a handful of distinct
+    #       strings, so string results are remembered in _INTERVAL_TO_INT.
+    if isinstance(interv, basestring):
+        try:
+            return _INTERVAL_TO_INT[interv]
+        except KeyError:
+            # we can't *just* use ('Rest' == interv) because the function sometimes receives "t"
+            # from the SuspensionIndexer.
+            if interv.endswith('t'):
+                post = 'Rest'
+            elif interv.startswith('-'):  # descending motion
+                post = int(interv[-1:]) * -1
+            else:
+                post = int(interv[-1:])
+            _INTERVAL_TO_INT[interv] = post
+            return post
+    elif isnan(interv):
         return nan_is
-    elif interv.startswith('-'):  # descending motion
-        return int(interv[-1:]) * -1
     else:
-        return int(interv[-1:])
+        raise TypeError(u"interval_to_int(): parameter 'interv' must be a string or NaN, not " +
+                        repr(interv))
+
+
+# Used by real_indexer() to delete the size from an Interval's "name," leaving only the quality.
+# NB: music21 gives the "name" as a str, so this uses the deletechars argument of str.translate().
+_INTERVAL_SIZE_CHARS = '0123456789'
+
 
+# Used by _pitch_for_name() to remember the Pitch for each note name, or None when the name is not
+# a pitch (i.e., it's a Rest). It starts with u'Rest' so no piece has to pay for music21 raising a
+# PitchException the first time.
+_PITCHES = {u'Rest': None}
 
-def real_indexer(simultaneity, simple, quality, byTones):
+
+def _pitch_for_name(name):
+    """
+    Used internally by :func:`real_indexer` and :func:`nq_score_indexer` so that music21 parses
+    each note name only once.
+
+    :param basestring name: The note name, as outputted by the :class:`NoteRestIndexer`.
+    :returns: The corresponding :class:`~music21.pitch.Pitch`, or ``None`` if ``name`` is not a
+        pitch. The :class:`Pitch` is shared, so callers must not modify it.
+    :rtype: :class:`music21.pitch.Pitch` or ``None``
+    """
+    try:
+        return _PITCHES[name]
+    except KeyError:
+        try:
+            the_pitch = pitch.Pitch(name)
+        except pitch.PitchException:
+            the_pitch = None
+        _PITCHES[name] = the_pitch
+        return the_pitch
+
+
+# Used by real_indexer() to remember the Interval between each (upper, lower) pair of note names,
+# or None when either is a Rest. Pieces use few distinct pitches, so the cache stays small.
+_INTERVAL_CACHE = {}
+
+
+def real_indexer(simultaneity, simple, quality, byTones=False):
     """
     Used internally by the :class:`IntervalIndexer` and :class:`HorizontalIntervalIndexer`.
 
@@ -113,7 +167,8 @@ def real_indexer(simultaneity, simple, quality, byTones):
     :type simple: boolean
     :param quality: Whether the interval's quality should be prepended.
     :type quality: boolean
-    :param byTones: whether the interval should be calculated using distance by tones
+    :param byTones: Whether the interval should be calculated using distance by tones. The
+        default is ``False``.
     :type byTones: boolean
 
     :returns: ``'Rest'`` if one or more of the parts is ``'Rest'``; otherwise, the interval
@@ -124,23 +179,32 @@ def real_indexer(simultaneity, simple, quality, byTones):
     if 2 != len(simultaneity):
         return None
     else:
+        upper, lower = simultaneity
+        if u'Rest' == upper or u'Rest' == lower:
+            return u'Rest'
         try:
-            upper, lower = simultaneity
-            interv = interval.Interval(note.Note(lower), note.Note(upper))
-        except pitch.PitchException:
+            interv = _INTERVAL_CACHE[(upper, lower)]
+        except KeyError:
+            lower_pitch = _pitch_for_name(lower)
+            upper_pitch = _pitch_for_name(upper)
+            if lower_pitch is None or upper_pitch is None:
+                interv = None
+            else:
+                # Interval only needs the Pitch of each note, and skipping the Note objects (with
+                # their Duration, Beams, and so on) makes this much cheaper
+                interv = interval.Interval(noteStart=lower_pitch, noteEnd=upper_pitch)
+            _INTERVAL_CACHE[(upper, lower)] = interv
+        if interv is None:
             return u'Rest'
-        post = u'-' if interv.direction < 0 else u''
+        # an Interval's direction is the sign of its semitones, so we only need the one attribute
+        semitones = interv.semitones
+        post = u'-' if semitones < 0 else u''
         if quality:
             # We must get all of the quality, and none of the size (important for AA, dd, etc.)
-            q_str = u''
-            for each in interv.name:
-                if each in u'AMPmd':
-                    q_str += each
-            post += q_str
+            post += interv.name.translate(None, _INTERVAL_SIZE_CHARS)
         elif byTones:
             # Set post to the float of semitones/2 --> tones
-            tone_flt = float(interv.semitones)/2.0
-            post = tone_flt
+            post = semitones / 2.0
         if simple and quality:
             post += u'8' if 8 == interv.generic.undirected \
                 else unicode(interv.generic.simpleUndirected)
@@ -148,61 +212,233 @@ def real_indexer(simultaneity, simple, quality, byTones):
             post += unicode(interv.generic.undirected)
         elif simple and byTones:
             post = post % 6.0 if post >= 0 else post % (-6.0)
+        elif simple and not byTones:
+            post += u'8' if 8 == interv.generic.undirected \
+                else unicode(interv.generic.simpleUndirected)
+        elif not byTones:
+            post += unicode(interv.generic.undirected)
         return post
 
 
-# We give these functions to the multiprocessor; they're pickle-able, they let us choose settings,
-# and the function still only requires one argument at run-time from the Indexer.mp_indexer().
-def indexer_tones_simple(ecks):
+def _align_parts(parts):
     """
-    Used internally by the :class:`IntervalIndexer` and :class:`HorizontalIntervalIndexer`.
+    Used internally by :func:`nq_score_indexer` and :func:`q_score_indexer` to put every part in
+    a two-dimensional array, with offsets in rows and parts in columns.
 
-    Call :func:`real_indexer` with settings to print simple intervals with quality.
-    """
-    return real_indexer(ecks, True, False, True)
+    :param parts: All the parts.
+    :type parts: list of :class:`pandas.Series`
 
-def indexer_tones_comp(ecks):
+    :returns: The offsets of the whole score; each part, aligned to those offsets with its note
+        names forward-filled; the staff position (diatonic note number) of each note; and the
+        pitch space number of each note. Both arrays have NaN wherever a part has a Rest.
+    :rtype: 4-tuple of :class:`pandas.Index`, list of :class:`pandas.Series`,
+        :class:`numpy.ndarray`, :class:`numpy.ndarray`
     """
-    Used internally by the :class:`IntervalIndexer` and :class:`HorizontalIntervalIndexer`.
-
-    Call :func:`real_indexer` with settings to print simple intervals with quality.
+    all_offsets = pandas.Index([])
+    for part in parts:
+        all_offsets = all_offsets.union(part.index)
+    names = [part.reindex(index=all_offsets, method='ffill') for part in parts]
+
+    staff_nums = {}
+    pitch_nums = {}
+    for name in set().union(*[part.values for part in names]):  # pylint: disable=W0142
+        if not isinstance(name, basestring):
+            continue
+        the_pitch = _pitch_for_name(name)
+        if the_pitch is not None:
+            staff_nums[name] = the_pitch.diatonicNoteNum
+            pitch_nums[name] = the_pitch.ps
+
+    staff_matrix = column_stack([part.map(staff_nums).values for part in names])
+    pitch_matrix = column_stack([part.map(pitch_nums).values for part in names])
+    return all_offsets, names, staff_matrix, pitch_matrix
+
+
+def _combo_rows(parts, combos, all_offsets):
     """
-    return real_indexer(ecks, False, False, True)
-
-def indexer_qual_simple(ecks):
+    Used internally by :func:`nq_score_indexer` and :func:`q_score_indexer` to find which rows of
+    the whole-score arrays belong to each part combination.
+
+    :param parts: All the parts.
+    :type parts: list of :class:`pandas.Series`
+    :param combos: The "upper" and "lower" part of each combination, as indices into ``parts``.
+    :type combos: list of 2-item list of int
+    :param all_offsets: The offsets of the whole score, as returned by :func:`_align_parts`.
+    :type all_offsets: :class:`pandas.Index`
+
+    :returns: For each combination, the offsets at which either part has an event, and the
+        position of those offsets in ``all_offsets``.
+    :rtype: list of 2-tuple of :class:`pandas.Index` and :class:`numpy.ndarray`
     """
-    Used internally by the :class:`IntervalIndexer` and :class:`HorizontalIntervalIndexer`.
+    post = []
+    for upper, lower in combos:
+        offsets = parts[upper].index
+        if offsets is not parts[lower].index:
+            offsets = offsets.union(parts[lower].index)
+        post.append((offsets, all_offsets.get_indexer(offsets)))
+    return post
+
 
-    Call :func:`real_indexer` with settings to print simple intervals with quality.
+def nq_series_indexer(parts, simple):
     """
-    return real_indexer(ecks, True, True, False)
+    Used internally by the :class:`IntervalIndexer` and :class:`HorizontalIntervalIndexer` in
+    place of :func:`~vis.analyzers.indexer.series_indexer` when intervals are wanted without
+    quality and without ``byTones``.
 
+    Such an interval depends only on the staff distance and the direction between two pitches, so
+    we ask music21 about each distinct note name once, then calculate every interval in the part
+    combination with arithmetic on whole arrays, rather than calling :func:`real_indexer` once per
+    offset.
 
-def indexer_qual_comp(ecks):
-    """
-    Used internally by the :class:`IntervalIndexer` and :class:`HorizontalIntervalIndexer`.
+    :param parts: The "upper" and "lower" parts, respectively.
+    :type parts: 2-item list of :class:`pandas.Series`
+    :param simple: Whether intervals should be reduced to their single-octave version.
+    :type simple: boolean
 
-    Call :func:`real_indexer` with settings to print compound intervals with quality.
+    :returns: The same intervals :func:`real_indexer` would give for every offset in either part.
+    :rtype: :class:`pandas.Series` of unicode string
     """
-    return real_indexer(ecks, False, True, False)
+    return nq_score_indexer(parts, [[0, 1]], simple)[0]
 
 
-def indexer_nq_simple(ecks):
+def nq_score_indexer(parts, combos, simple, by_tones=False):
     """
-    Used internally by the :class:`IntervalIndexer` and :class:`HorizontalIntervalIndexer`.
+    Like :func:`nq_series_indexer`, but for many part combinations at once. Every part is aligned
+    to the offsets of the whole score and converted to numbers once, in a two-dimensional array
+    with one column per part, so each part combination only needs a subtraction between two
+    columns.
+
+    This also calculates intervals for the ``byTones`` setting, which only depend on the
+    semitones between two pitches.
+
+    :param parts: All the parts.
+    :type parts: list of :class:`pandas.Series`
+    :param combos: The "upper" and "lower" part of each combination, as indices into ``parts``.
+    :type combos: list of 2-item list of int
+    :param simple: Whether intervals should be reduced to their single-octave version.
+    :type simple: boolean
+    :param by_tones: Whether intervals should be the distance in whole tones, as a float.
+    :type by_tones: boolean
 
-    Call :func:`real_indexer` with settings to print simple intervals without quality.
+    :returns: The intervals for each part combination, in the same order as ``combos``.
+    :rtype: list of :class:`pandas.Series` of unicode string (or float, with ``by_tones``)
     """
-    return real_indexer(ecks, True, False, False)
+    if 0 == len(combos):
+        return []
+
+    all_offsets, _, staff_matrix, pitch_matrix = _align_parts(parts)
+
+    # calculate every part combination at once, with offsets in rows and combinations in columns
+    uppers = [combo[0] for combo in combos]
+    lowers = [combo[1] for combo in combos]
+    if by_tones:
+        intervals = (pitch_matrix[:, uppers] - pitch_matrix[:, lowers]) / 2.0
+        if simple:
+            intervals = where(intervals >= 0, mod(intervals, 6.0), mod(intervals, -6.0))
+    else:
+        intervals = abs(staff_matrix[:, uppers] - staff_matrix[:, lowers]) + 1
+        if simple:
+            intervals = where(intervals == 8, 8, (intervals - 1) % 7 + 1)
+        # like music21, the direction of an Interval depends on its semitones
+        intervals[pitch_matrix[:, uppers] < pitch_matrix[:, lowers]] *= -1
+        labels = {each: unicode(int(each)) for each in unique(intervals[~isnan(intervals)])}
+
+    # then keep only the offsets that belong to each part combination
+    post = []
+    for i, (offsets, rows) in enumerate(_combo_rows(parts, combos, all_offsets)):
+        column = intervals[rows, i]
+        if by_tones:
+            column = pandas.Series(column, index=offsets, dtype=object)
+        else:
+            column = pandas.Series(column, index=offsets).map(labels)
+        post.append(column.fillna(u'Rest'))
+    return post
 
 
-def indexer_nq_comp(ecks):
+def q_score_indexer(parts, combos, indexer_func):
+    """
+    Like :func:`nq_score_indexer`, but for intervals with quality.
+
+    An interval's quality, size, and direction all depend only on the number of staff positions
+    and the number of semitones between its pitches, so we calculate those two numbers for every
+    part combination at once, then call ``indexer_func`` for only one pair of note names with
+    each distinct pair of numbers. For example, C4 to E4 and D4 to F#4 share a label.
+
+    :param parts: All the parts.
+    :type parts: list of :class:`pandas.Series`
+    :param combos: The "upper" and "lower" part of each combination, as indices into ``parts``.
+    :type combos: list of 2-item list of int
+    :param indexer_func: Called with a 2-tuple of the upper and lower note names to get the label
+        for an interval, such as one of the :const:`_INDEXER_FUNCS`.
+    :type indexer_func: callable
+
+    :returns: The intervals for each part combination, in the same order as ``combos``.
+    :rtype: list of :class:`pandas.Series` of unicode string
+    """
+    if 0 == len(combos):
+        return []
+
+    all_offsets, names, staff_matrix, pitch_matrix = _align_parts(parts)
+
+    # with offsets in rows and combinations in columns, find the distinct intervals
+    uppers = [combo[0] for combo in combos]
+    lowers = [combo[1] for combo in combos]
+    codes = ((staff_matrix[:, uppers] - staff_matrix[:, lowers]) +
+             1j * (pitch_matrix[:, uppers] - pitch_matrix[:, lowers]))
+    is_rest = isnan(codes)
+    distinct, firsts, inverse = unique(codes[~is_rest], return_index=True, return_inverse=True)
+
+    # label one example of each distinct interval
+    code_rows, code_cols = (~is_rest).nonzero()
+    labels = empty(len(distinct), dtype=object)
+    for i, first in enumerate(firsts):
+        row, col = code_rows[first], code_cols[first]
+        labels[i] = indexer_func((names[uppers[col]].values[row], names[lowers[col]].values[row]))
+    intervals = empty(codes.shape, dtype=object)
+    intervals[is_rest] = u'Rest'
+    intervals[~is_rest] = labels[inverse]
+
+    # then keep only the offsets that belong to each part combination
+    return [pandas.Series(intervals[rows, i], index=offsets)
+            for i, (offsets, rows) in enumerate(_combo_rows(parts, combos, all_offsets))]
+
+
+class _SpecializedIndexer(object):
     """
     Used internally by the :class:`IntervalIndexer` and :class:`HorizontalIntervalIndexer`.
 
-    Call :func:`real_indexer` with settings to print compound intervals without quality.
+    Call :func:`real_indexer` with fixed settings. The result for each (upper, lower) pair of note
+    names is remembered, so the settings are only examined the first time a pair appears.
     """
-    return real_indexer(ecks, False, False, False)
+
+    def __init__(self, simple, quality, byTones):  # pylint: disable=invalid-name
+        self._settings = (simple, quality, byTones)
+        self._results = {}
+
+    def __call__(self, simultaneity):
+        if 2 != len(simultaneity):
+            return None
+        pair = tuple(simultaneity)
+        try:
+            return self._results[pair]
+        except KeyError:
+            post = real_indexer(pair, *self._settings)  # pylint: disable=W0142
+            self._results[pair] = post
+            return post
+
+
+# We give these functions to the multiprocessor; they're pickle-able, they let us choose settings,
+# and the function still only requires one argument at run-time from the Indexer.mp_indexer().
+# The keys are (byTones, quality, simple). Since "byTones" overrides "quality," there are no keys
+# where both are True.
+_INDEXER_FUNCS = {
+    (True, False, True): _SpecializedIndexer(simple=True, quality=False, byTones=True),
+    (True, False, False): _SpecializedIndexer(simple=False, quality=False, byTones=True),
+    (False, True, True): _SpecializedIndexer(simple=True, quality=True, byTones=False),
+    (False, True, False): _SpecializedIndexer(simple=False, quality=True, byTones=False),
+    (False, False, True): _SpecializedIndexer(simple=True, quality=False, byTones=False),
+    (False, False, False): _SpecializedIndexer(simple=False, quality=False, byTones=False),
+}
 
 
 class IntervalIndexer(indexer.Indexer):
@@ -244,38 +480,27 @@ class IntervalIndexer(indexer.Indexer):
 
         # Check all required settings are present in the "settings" argument
         self._settings = {}
-        if 'simple or compound' in settings:
-            self._settings['simple or compound'] = settings['simple or compound']
+        if u'simple or compound' in settings:
+            self._settings[u'simple or compound'] = settings[u'simple or compound']
         else:
-            self._settings['simple or compound'] = \
-                IntervalIndexer.default_settings['simple or compound']  # pylint: disable=C0301
-        if 'quality' in settings:
-            self._settings['quality'] = settings['quality']
+            self._settings[u'simple or compound'] = \
+                IntervalIndexer.default_settings[u'simple or compound']  # pylint: disable=C0301
+        if u'quality' in settings:
+            self._settings[u'quality'] = settings[u'quality']
         else:
-            self._settings['quality'] = IntervalIndexer.default_settings['quality']
-        if 'byTones' in settings:
-            self._settings['byTones'] = settings['byTones']
+            self._settings[u'quality'] = IntervalIndexer.default_settings[u'quality']
+        if u'byTones' in settings:
+            self._settings[u'byTones'] = settings[u'byTones']
         else:
-            self._settings['byTones'] = IntervalIndexer.default_settings['byTones']
+            self._settings[u'byTones'] = IntervalIndexer.default_settings[u'byTones']
 
         super(IntervalIndexer, self).__init__(score, None)
 
         # Which indexer function to set?
-        if self._settings['byTones']:
-            if 'simple' == self._settings['simple or compound']:
-                self._indexer_func = indexer_tones_simple
-            else:
-                self._indexer_func = indexer_tones_comp
-        elif self._settings['quality']:
-            if 'simple' == self._settings['simple or compound']:
-                self._indexer_func = indexer_qual_simple
-            else:
-                self._indexer_func = indexer_qual_comp
-        else:
-            if 'simple' == self._settings['simple or compound']:
-                self._indexer_func = indexer_nq_simple
-            else:
-                self._indexer_func = indexer_nq_comp
+        by_tones = bool(self._settings[u'byTones'])
+        self._indexer_func = _INDEXER_FUNCS[(by_tones,
+                                             bool(self._settings[u'quality']) and not by_tones,
+                                             u'simple' == self._settings[u'simple or compound'])]
 
     def run(self):
         """
@@ -297,13 +522,11 @@ class IntervalIndexer(indexer.Indexer):
         >>> the_intervals['interval.IntervalIndexer']['5,6']
         (Series with vertical intervals between first and second clarinet)
         """
-        combinations = []
-        combination_labels = []
-        # To calculate all 2-part combinations:
-        for left in xrange(len(self._score)):
-            for right in xrange(left + 1, len(self._score)):
-                combinations.append([left, right])
-                combination_labels.append(unicode(left) + u',' + unicode(right))
+        # To calculate all 2-part combinations, take the indices above the diagonal of a square
+        # matrix; they come out in the same order as a nested "left" and "right" loop would give.
+        lefts, rights = triu_indices(len(self._score), 1)
+        combinations = [[left, right] for left, right in zip(lefts.tolist(), rights.tolist())]
+        combination_labels = [u'%d,%d' % (left, right) for left, right in combinations]
 
         # This method returns once all computation is complete. The results are returned as a list
         # of Series objects in the same order as the "combinations" argument.
@@ -313,6 +536,27 @@ class IntervalIndexer(indexer.Indexer):
         return self.make_return(combination_labels, results)
 
 
+    def _do_multiprocessing(self, combos):
+        """
+        Index each part combination, like :meth:`Indexer._do_multiprocessing`. Unless quality is
+        required, all the part combinations are calculated together by :func:`nq_score_indexer`.
+        With quality, :func:`q_score_indexer` calls :attr:`_indexer_func` only once for each
+        distinct interval in the whole score.
+
+        :param combos: A list of all voice combinations to be analyzed.
+        :type combos: list of list of integers
+
+        :returns: Analysis results.
+        :rtype: list of :class:`pandas.Series`
+        """
+        if self._settings[u'quality'] and not self._settings[u'byTones']:
+            return q_score_indexer(self._score, combos, self._indexer_func)
+        return nq_score_indexer(self._score,
+                                combos,
+                                u'simple' == self._settings[u'simple or compound'],
+                                bool(self._settings[u'byTones']))
+
+
 class HorizontalIntervalIndexer(IntervalIndexer):
     """
     Use :class:`music21.interval.Interval` to create an index of the horizontal (melodic) intervals
@@ -360,9 +604,13 @@ class HorizontalIntervalIndexer(IntervalIndexer):
         # first element, and the other will be missing the last element. We'll also use the index
         # values starting at the second element, so that each "horizontal" interval is presented
         # as occurring at the offset of the second note involved.
-        combination_labels = [unicode(x) for x in xrange(len(self._score))]
-        new_parts = [x.iloc[1:] for x in self._score]
-        self._score = [pandas.Series(x.values[:-1], index=x.index.tolist()[1:]) for x in self._score]
+        # Both copies share one Index object, so they need not be aligned with each other later.
+        combination_labels = [u'%d' % x for x in xrange(len(self._score))]
+        shifted_indices = [x.index[1:] for x in self._score]
+        new_parts = [pandas.Series(x.values[1:], index=shifted_indices[i], copy=False)
+                     for i, x in enumerate(self._score)]
+        self._score = [pandas.Series(x.values[:-1], index=shifted_indices[i], copy=False)
+                       for i, x in enumerate(self._score)]
 
         new_zero = len(self._score)
         self._score.extend(new_parts)
@@ -375,7 +623,7 @@ class HorizontalIntervalIndexer(IntervalIndexer):
         # START DEBUG (this hack makes the indices start with offset 0.0, rather than the first thing after that)
         #beaches = [[0.0] for _ in xrange(len(results))]
         #for i, each_beach in enumerate(beaches):
-            #each_beach.extend(results[i].index.tolist()[:-1])
+            #each_beach.extend(results[i].index[:-1])
         #results = [pandas.Series(x.values, index=beaches[i]) for i, x in enumerate(results)]
         # END DEBUG
         return  self.make_return(combination_labels, results)
@@ -396,20 +644,23 @@ class VariableHorizontalIntervalIndexer(IntervalIndexer):
     def run(self):
 
         # Get the offsets output from previous score, assume equal distribution -- i.e. noterest or filterbyoffset filters
-        score_offsets = self._score[0].index.values
+        score_offsets = self._score[0].index
         # The difference in offset of each event... == quarterlength if using FilterByOffset
-        increment_size = score_offsets[-1]/(len(score_offsets)-1)
-        #print score_offsets 
-        #print increment_size
-        # Factor by which intervalDistance is more than increments
-        distance_increment_factor = self._settings['intervalDistance']/increment_size
-        #print int(distance_increment_factor)
-
-        combination_labels = [unicode(x) for x in xrange(len(self._score))]
-        new_parts = [x.iloc[int(distance_increment_factor):] for x in self._score]
-        self._score = [pandas.Series(x.values[:-int(distance_increment_factor)], index=x.index.tolist()[int(distance_increment_factor):]) for x in self._score]
+        increment_size = score_offsets[-1] / (len(score_offsets) - 1)
+        # Factor by which intervalDistance is more than increments, as a number of events
+        distance_increment_factor = int(self._settings[u'intervalDistance'] / increment_size)
 
         new_zero = len(self._score)
+        combination_labels = [u'%d' % x for x in xrange(new_zero)]
+        shifted_indices = [x.index[distance_increment_factor:] for x in self._score]
+        new_parts = [pandas.Series(x.values[distance_increment_factor:],
+                                   index=shifted_indices[i],
+                                   copy=False)
+                     for i, x in enumerate(self._score)]
+        self._score = [pandas.Series(x.values[:-distance_increment_factor],
+                                     index=shifted_indices[i],
+                                     copy=False)
+                       for i, x in enumerate(self._score)]
         self._score.extend(new_parts)
 
         combinations = [[new_zero + x, x] for x in xrange(new_zero)]
@@ -32,16 +32,99 @@ that should produce a score of the input.
 # Disable "string statement has no effect"
 # pylint: disable=W0105
 
-from math import fsum
+from math import frexp, ldexp
+import pandas
 from music21 import stream, note, duration
 import outputlilypond
 from outputlilypond import settings as oly_settings
 from vis.analyzers import indexer
 
 
+def _highest_valid_ql(this_ql):
+    """
+    Used internally by :func:`_solve_ql` to find the largest quarterLength that is not greater
+    than ``this_ql``, nor greater than ``2.0``.
+
+    :param this_ql: The quarterLength to fit.
+    :type this_ql: ``float``
+
+    :returns: The largest valid quarterLength.
+    :rtype: ``float``
+
+    Every valid quarterLength is a power of two between ``0.015625`` and ``2.0``, so rather than
+    checking them in turn, we take the largest power of two from the exponent of ``this_ql``.
+    """
+    if this_ql >= 2.0:
+        return 2.0
+    elif this_ql < 0.015625:
+        return 0.0
+    else:
+        # frexp() gives this_ql == mantissa * 2 ** exponent, where 0.5 <= mantissa < 1
+        return ldexp(0.5, frexp(this_ql)[1])
+
+
+def _solve_ql(total_ql):
+    """
+    Used internally by :meth:`PartNotesIndexer._fill_space_between_offsets` to find the
+    quarterLength values that fill ``total_ql``.
+
+    :param total_ql: The quarterLength to fill.
+    :type total_ql: ``float``
+
+    :returns: The quarterLength values that fill the whole duration.
+    :rtype: ``list`` of ``float``
+
+    :raises: :exc:`RuntimeError` if ``total_ql`` cannot be filled with valid quarterLengths.
+    """
+    if 0.0 == total_ql:
+        return [0.0]
+    elif total_ql < 0.0:
+        raise RuntimeError(PartNotesIndexer._IMPOSSIBLE_QUARTERLENGTH % total_ql)
+    # as many whole notes as will fit...
+    wholes, ql_remains = divmod(total_ql, 4.0)
+    post = [4.0] * int(wholes)
+    # ... then successively shorter values for the rest
+    while ql_remains >= 0.015625:
+        highest = _highest_valid_ql(ql_remains)
+        post.append(highest)
+        ql_remains -= highest
+    if 0.0 != ql_remains:
+        raise RuntimeError(PartNotesIndexer._IMPOSSIBLE_QUARTERLENGTH % total_ql)
+    return post
+
+
+def _insert_all(the_part, pending):
+    """
+    Used internally by :class:`PartNotesIndexer` to insert many objects into a :class:`Part`.
+
+    Every call to :meth:`~music21.stream.Stream.insert` checks the whole :class:`Stream` for the
+    object and clears its caches, which makes building a long :class:`Part` quadratic. This
+    inserts everything with music21's unchecked method, then updates the :class:`Part` once.
+
+    :param the_part: The :class:`Part` into which to insert objects.
+    :type the_part: :class:`music21.stream.Part`
+    :param pending: Offsets alternating with the object to insert at that offset, as for the
+        single-argument form of :meth:`~music21.stream.Stream.insert`. No object may already be
+        in ``the_part``, nor appear twice.
+    :type pending: ``list``
+
+    :returns: ``None``
+    """
+    # pylint: disable=protected-access
+    for i in xrange(0, len(pending), 2):
+        the_part._insertCore(pending[i], pending[i + 1])
+    the_part._elementsChanged()
+
+
+# Used by annotation_func() and AnnotationIndexer to surround an annotation in a "markup" command.
+_MARKUP_PREFIX = u'_\\markup{ "'
+_MARKUP_SUFFIX = u'" }'
+
+
 def annotation_func(obj):
     """
-    Used by :class:`AnnotationIndexer` to make a "markup" command for LilyPond scores.
+    Make a "markup" command for LilyPond scores. The :class:`AnnotationIndexer` produces the same
+    result for a whole :class:`Series` at once.
 
     :param obj: A single-element :class:`Series` with the string to wrap in a "markup" command.
     :type obj: :class:`pandas.Series` of ``unicode``
@@ -49,7 +132,7 @@ def annotation_func(obj):
     :returns: The thing in a markup.
     :rtype: ``unicode``
     """
-    return u''.join([u'_\\markup{ "', unicode(obj[0]), u'" }'])
+    return u''.join([_MARKUP_PREFIX, unicode(obj[0]), _MARKUP_SUFFIX])
 
 
 def annotate_the_note(obj):
@@ -204,9 +287,9 @@ class AnnotationIndexer(indexer.Indexer):
             constructor. Each element in the :class:`Series` is a ``basestring``.
         :rtype: ``list`` of :class:`pandas.Series`
         """
-        # Calculate each part separately:
-        combinations = [[x] for x in xrange(len(self._score))]
-        return self._do_multiprocessing(combinations)
+        # The markup only depends on each value, so we can build every part's strings at once,
+        # with the same result annotation_func() would give.
+        return [_MARKUP_PREFIX + part.map(unicode) + _MARKUP_SUFFIX for part in self._score]
 
 
 class AnnotateTheNoteIndexer(indexer.Indexer):
@@ -243,9 +326,11 @@ class AnnotateTheNoteIndexer(indexer.Indexer):
             constructor. Each element in the :class:`Series` is a ``basestring``.
         :rtype: ``list`` of :class:`pandas.Series`
         """
-        # Calculate each part separately:
-        combinations = [[x] for x in xrange(len(self._score))]
-        return self._do_multiprocessing(combinations)
+        # Each Note only depends on one value, so there's no need to align the parts in a DataFrame
+        # with series_indexer(); call annotate_the_note() directly for each value.
+        return [pandas.Series([annotate_the_note((value,)) for value in part.values],
+                              index=part.index)
+                for part in self._score]
 
 
 class PartNotesIndexer(indexer.Indexer):
@@ -305,38 +390,7 @@ class PartNotesIndexer(indexer.Indexer):
         The algorithm tries to use as few ``quarterLength`` values as possible, but prefers multiple
         values to a single dotted value. The longest single value is ``4.0`` (a whole note).
         """
-        VALID_DURATIONS = (2.0, 1.0, 0.5, 0.25, 0.125, 0.0625, 0.03125, 0.015625, 0.0)  # pylint: disable=invalid-name
-
-        def find_highest_valid_ql(this_ql, recursor=0):
-            """
-            Returns the largest quarterLength that is less then "this_ql" but not greater than 2.0.
-            """
-            if VALID_DURATIONS[recursor] <= this_ql:
-                return VALID_DURATIONS[recursor]
-            else:
-                return find_highest_valid_ql(this_ql, recursor + 1)
-
-        def the_solver(ql_remains):
-            """
-            Given the "quarterLength that remains to be dealt with," this method returns
-            the solution.
-            """
-            if 0.0 == ql_remains:
-                return [0.0]
-            elif 4.0 == ql_remains:
-                return [4.0]
-            elif ql_remains > 4.0:
-                return [4.0] + the_solver(ql_remains - 4.0)
-            elif 4.0 > ql_remains >= 0.015625:
-                highest = find_highest_valid_ql(ql_remains)
-                if highest == ql_remains:
-                    return [ql_remains]
-                else:
-                    return [highest] + the_solver(ql_remains - highest)
-            else:
-                raise RuntimeError(PartNotesIndexer._IMPOSSIBLE_QUARTERLENGTH % (end_o - start_o))
-
-        return the_solver(float(end_o) - float(start_o))
+        return _solve_ql(float(end_o) - float(start_o))
 
     @staticmethod
     def _set_durations(in_part):
@@ -363,24 +417,27 @@ class PartNotesIndexer(indexer.Indexer):
                  Rest(offset=2.0, duration=1.0),
                  Note(offset=4.0, duration=1.0)]
         """
-        in_len = len(in_part)
+        # get the objects and their offsets once, rather than asking the Part for each
+        in_notes = list(in_part.elements)
+        in_offsets = [each_note.offset for each_note in in_notes]
         ret_part = stream.Part()
-        for i in xrange(in_len):
-            qls = None
-            try:
-                qls = PartNotesIndexer._fill_space_between_offsets(in_part[i].offset,
-                                                                   in_part[i + 1].offset)
-            except stream.StreamException:  # when we try to access the note after the last
+        pending = []  # offsets alternating with objects, as for music21's Stream.insert()
+        for i, each_note in enumerate(in_notes):
+            if i + 1 < len(in_notes):
+                qls = PartNotesIndexer._fill_space_between_offsets(in_offsets[i], in_offsets[i + 1])
+            else:  # the last note
                 qls = [1.0]
-            in_part[i].duration = duration.Duration(quarterLength=qls[0])
-            ret_part.insert(in_part[i].offset, in_part[i])
-            for j in xrange(len(qls[1:])):
-                # the offset for insertion is...
-                #   offset of the Note object, plus
-                #   duration of the Note object, plus
-                #   duration of all the previously-inserted Rest objects
-                ret_part.insert(in_part[i].offset + qls[0] + fsum(qls[1:j + 1]),
-                                note.Rest(quarterLength=qls[j + 1]))
+            each_note.duration = duration.Duration(quarterLength=qls[0])
+            pending.extend((in_offsets[i], each_note))
+            # the offset for insertion is...
+            #   offset of the Note object, plus
+            #   duration of the Note object, plus
+            #   duration of all the previously-inserted Rest objects
+            rest_offset = in_offsets[i] + qls[0]
+            for rest_ql in qls[1:]:
+                pending.extend((rest_offset, note.Rest(quarterLength=rest_ql)))
+                rest_offset += rest_ql
+        _insert_all(ret_part, pending)
         if hasattr(in_part, u'lily_analysis_voice'):
             ret_part.lily_analysis_voice = in_part.lily_analysis_voice
         if hasattr(in_part, u'lily_instruction'):
@@ -435,8 +492,10 @@ class PartNotesIndexer(indexer.Indexer):
             else:
                 new_part.lily_instruction = u'\t\\textLengthOn\n'
             # put the Note objects into a new stream.Part, using the right offset
+            pending = []
             for off, obj in each_series.iteritems():
-                new_part.insert(off, obj)
+                pending.extend((off, obj))
+            _insert_all(new_part, pending)
 
             post.append(PartNotesIndexer._set_durations(new_part))
         return post
@@ -31,8 +31,11 @@ Indexers for metric concerns.
 # disable "string statement has no effect" warning---they do have an effect with Sphinx!
 # pylint: disable=W0105
 
-from music21 import note, meter
+import multiprocessing
+import pandas
+from music21 import converter, note, meter
 from vis.analyzers import indexer
+from vis.analyzers.indexers import noterest
 
 
 def beatstrength_ind_func(obj):
@@ -48,7 +51,116 @@ def beatstrength_ind_func(obj):
     return obj[0].beatStrength
 
 def timeSignature_ind_func(obj):
-    return obj[0].ratioString
+    """
+    The function that indexes the "ratioString" of a :class:`TimeSignature`.
+
+    Every :class:`TimeSignature` with the same ratio gives the same (interned) string object, so
+    the index holds one copy of each, and comparing them is quick.
+
+    :param obj: A singleton list with the :class:`TimeSignature` to index.
+    :type obj: list of :class:`music21.meter.TimeSignature`
+
+    :returns: The :attr:`~music21.meter.TimeSignature.ratioString` of the inputted object.
+    :rtype: str
+    """
+    return intern(obj[0].ratioString)
+
+
+def _accent_weight(accent_weights, time_sig, offset):
+    """
+    Used internally by :func:`beat_strengths` to find the accent weight of an offset in a bar.
+    Music is repetitive, so each offset is calculated by music21 only once for each
+    :class:`TimeSignature`.
+
+    :param accent_weights: The accent weights already calculated, keyed on the id() of each
+        :class:`TimeSignature`. Each value is the :class:`TimeSignature` and a dict of its weights
+        keyed on offset; keeping the :class:`TimeSignature` means its id() cannot be given to a new
+        object while ``accent_weights`` is in use. New weights are added to this dict.
+    :type accent_weights: dict
+    :param time_sig: The :class:`TimeSignature` in effect.
+    :type time_sig: :class:`music21.meter.TimeSignature`
+    :param offset: The offset from the start of the bar.
+    :type offset: float
+
+    :returns: The accent weight, as for :attr:`~music21.base.Music21Object.beatStrength`.
+    :rtype: float
+    """
+    try:
+        weights = accent_weights[id(time_sig)][1]
+    except KeyError:
+        weights = {}
+        accent_weights[id(time_sig)] = (time_sig, weights)
+    try:
+        return weights[offset]
+    except KeyError:
+        post = time_sig.getAccentWeight(offset, forcePositionMatch=True, permitMeterModulus=False)
+        weights[offset] = post
+        return post
+
+
+def beat_strengths(part, accent_weights=None):
+    """
+    Used internally by :class:`NoteBeatStrengthIndexer` to find the
+    :attr:`~music21.base.Music21Object.beatStrength` of every :class:`Note` and :class:`Rest` in a
+    :class:`Part`.
+
+    This gives the same results as music21, but music21 searches the whole :class:`Part` for the
+    :class:`TimeSignature` and :class:`Measure` of every object, which dominates the time it takes
+    to index a piece. Instead, we walk through the :class:`Part` in order, keeping track of the
+    :class:`TimeSignature` in effect, and remember the accent weight of each offset in a bar.
+
+    :param part: The :class:`Part` to index.
+    :type part: :class:`music21.stream.Part`
+    :param accent_weights: The accent weights already calculated, as for :func:`_accent_weight`,
+        so several :class:`Part` objects can share them. The default is a new, empty dict.
+    :type accent_weights: dict
+
+    :returns: The beat strength of every :class:`Note` and :class:`Rest`, keyed on the id() of
+        the object. Objects that precede the first :class:`TimeSignature` are omitted.
+    :rtype: dict
+    """
+    post = {}
+    if accent_weights is None:
+        accent_weights = {}
+    bar_info = {}  # for each TimeSignature, its offset in a Measure and the length of a bar
+    time_sig = [None]  # the TimeSignature in effect; in a list so walk() may change it
+
+    def walk(container):
+        """
+        Find the beat strength of every Note and Rest in "container" and the Streams within it.
+        """
+        # pylint: disable=protected-access
+        for each in container:  # iterating sets the activeSite, needed by _getMeasureOffset()
+            if each.isStream:
+                walk(each)
+            elif isinstance(each, meter.TimeSignature):
+                time_sig[0] = each
+                bar_info[id(each)] = (each._getMeasureOffset(includeMeasurePadding=False),
+                                      each.barDuration.quarterLength)
+            elif time_sig[0] is not None and isinstance(each, (note.Note, note.Rest)):
+                # this is music21's Music21Object._getMeasureOffsetOrMeterModulusOffset()
+                ts_offset, bar_length = bar_info[id(time_sig[0])]
+                offset = each._getMeasureOffset()
+                if offset + ts_offset >= bar_length:
+                    offset = (offset - ts_offset) % bar_length
+                post[id(each)] = _accent_weight(accent_weights, time_sig[0], offset)
+
+    walk(part)
+    return post
+
+
+def _beat_strengths_of_file(pathname):
+    """
+    Used internally by :meth:`NoteBeatStrengthIndexer.run_batch` to import and index one file in a
+    worker process.
+
+    :param pathname: The file to import.
+    :type pathname: basestring
+
+    :returns: The results of :meth:`NoteBeatStrengthIndexer.run`.
+    :rtype: :class:`pandas.DataFrame`
+    """
+    return NoteBeatStrengthIndexer(converter.parse(pathname)).run()
 
 
 class NoteBeatStrengthIndexer(indexer.Indexer):
@@ -57,7 +169,8 @@ class NoteBeatStrengthIndexer(indexer.Indexer):
     and :class:`Rest` objects.
 
     .. note:: Unlike nearly all other indexers, this indexer returns a :class:`Series` of ``float``
-        objects rather than ``unicode`` objects.
+        objects rather than ``unicode`` objects. They are stored as ``float32``, which holds every
+        beat strength exactly in half the memory.
     """
 
     required_score_type = 'stream.Part'
@@ -98,8 +211,98 @@ class NoteBeatStrengthIndexer(indexer.Indexer):
         """
 
         combinations = [[x] for x in xrange(len(self._score))]
-        results = self._do_multiprocessing(combinations)
-        return self.make_return([unicode(x)[1:-1] for x in combinations], results)
+        self._indexer_func = self._lookup_func()
+        try:
+            results = [part.astype('float32') for part in self._do_multiprocessing(combinations)]
+        finally:
+            self._indexer_func = beatstrength_ind_func
+        return self.make_return([unicode(x[0]) for x in combinations], results)
+
+    def run_fused(self):
+        """
+        Make a new index of the piece, along with the index made by :class:`NoteRestIndexer`, from
+        one pass through each :class:`Part`. Use this instead of running both indexers when you
+        need both results.
+
+        :returns: The results of both indexers, with the :class:`NoteRestIndexer` columns first.
+        :rtype: :class:`pandas.DataFrame`
+
+        **Example:**
+
+        >>> the_score = music21.converter.parse('sibelius_5-i.mei')
+        >>> both = NoteBeatStrengthIndexer(the_score).run_fused()
+        >>> both['noterest.NoteRestIndexer']['5']
+        (the first clarinet Series of note names)
+        >>> both['metre.NoteBeatStrengthIndexer']['5']
+        (the first clarinet Series of beatStrength float values)
+        """
+        lookup_func = self._lookup_func()
+        combinations = [[x] for x in xrange(len(self._score))]
+        self._indexer_func = lambda obj: (noterest.indexer_func(obj), lookup_func(obj))
+        try:
+            results = self._do_multiprocessing(combinations)
+        finally:
+            self._indexer_func = beatstrength_ind_func
+        labels = [unicode(x[0]) for x in combinations]
+        note_rests = [pandas.Series([x[0] for x in part.values], index=part.index)
+                      for part in results]
+        strengths = [pandas.Series([x[1] for x in part.values], index=part.index, dtype='float32')
+                     for part in results]
+        return pandas.concat([noterest.NoteRestIndexer.make_return(labels, note_rests),
+                              self.make_return(labels, strengths)],
+                             axis=1)
+
+    @classmethod
+    def run_batch(cls, pathnames, n_procs=None):
+        """
+        Make the index of many pieces, sharing them between worker processes.
+
+        Each worker imports its own files, so no :class:`Score` has to be sent between processes;
+        that would take longer than indexing it. Every file must import as a :class:`Score`
+        rather than an :class:`Opus`.
+
+        :param pathnames: The files to index.
+        :type pathnames: list of basestring
+        :param n_procs: The number of worker processes. The default is the number of CPUs.
+        :type n_procs: int
+
+        :returns: The results of :meth:`run` for each file, in the same order as ``pathnames``.
+        :rtype: list of :class:`pandas.DataFrame`
+        """
+        if n_procs is None:
+            n_procs = multiprocessing.cpu_count()
+        n_procs = max(1, min(n_procs, len(pathnames)))
+        pool = multiprocessing.Pool(n_procs)
+        try:
+            return pool.map(_beat_strengths_of_file, pathnames,
+                            chunksize=max(1, len(pathnames) // (4 * n_procs)))
+        finally:
+            pool.close()
+            pool.join()
+
+    def _lookup_func(self):
+        """
+        Find the beat strength of every :class:`Note` and :class:`Rest` in the piece, for
+        :meth:`run` and :meth:`run_fused`.
+
+        :returns: A function to use as the indexer function. It finds the beat strength already
+            calculated for an object, or else asks music21.
+        :rtype: function
+        """
+        accent_weights = {}
+        strengths = {}
+        for part in self._score:
+            strengths.update(beat_strengths(part, accent_weights))
+
+        def lookup_func(obj):
+            """
+            Find the beat strength already calculated for an object, or else ask music21.
+            """
+            try:
+                return strengths[id(obj[0])]
+            except KeyError:
+                return beatstrength_ind_func(obj)
+        return lookup_func
 
 class TimeSignatureIndexer(indexer.Indexer):
 
@@ -117,4 +320,4 @@ class TimeSignatureIndexer(indexer.Indexer):
 
         combinations = [[x] for x in xrange(len(self._score))]
         results = self._do_multiprocessing(combinations)
-        return self.make_return([unicode(x)[1:-1] for x in combinations], results)
\ No newline at end of file
+        return self.make_return([unicode(x[0]) for x in combinations], results)
\ No newline at end of file
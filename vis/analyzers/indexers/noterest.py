@@ -99,4 +99,4 @@ class NoteRestIndexer(indexer.Indexer):
         """
         combinations = [[x] for x in xrange(len(self._score))]  # calculate each voice separately
         results = self._do_multiprocessing(combinations)
-        return self.make_return([unicode(x)[1:-1] for x in combinations], results)
+        return self.make_return([unicode(x[0]) for x in combinations], results)
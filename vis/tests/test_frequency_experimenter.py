@@ -69,6 +69,18 @@ class TestExperimenterFunc(unittest.TestCase):
         for each_i in expected[1].index:
             self.assertEqual(expected[1][each_i], actual[1][each_i])
 
+    def test_func_4(self):
+        # NaN values are not counted
+        ident = 42
+        in_series = Series([u'M3', float('nan'), u'P5', u'M3', float('nan')])
+        expected = (ident, Series({u'M3': 2, u'P5': 1}))
+        actual = experimenter_func((ident, in_series))
+        self.assertEqual(len(expected), len(actual))
+        self.assertEqual(expected[0], actual[0])
+        self.assertEqual(len(expected[1]), len(actual[1]))
+        for each_i in expected[1].index:
+            self.assertEqual(expected[1][each_i], actual[1][each_i])
+
 
 # pylint: disable=W0212
 class TestRun(unittest.TestCase):
@@ -564,6 +564,39 @@ class TestIndexerMultiEvent(IndexerTestBase):
         self.assertSequenceEqual(list(expected.index), list(actual.index))
         self.assertSequenceEqual(list(expected), list(actual))
 
+    def test_first_events_at_1(self):
+        # that we get the same objects as from getElementsByOffset(), with overlapping objects,
+        # a zero-length object, and an offset where nothing is happening
+        the_stream = stream.Stream()
+        for offset, length, number in [(0.0, 2.0, 0), (0.5, 0.5, 1), (1.0, 0.0, 2), (1.0, 1.5, 3),
+                                       (4.0, 1.0, 4)]:
+            obj = base.ElementWrapper(number)
+            obj.duration = duration.Duration(length)
+            the_stream.insert(offset, obj)
+        offsets = [0.0, 0.5, 1.0, 2.0, 2.5, 3.0, 4.0]
+        expected = [0, 0, 0, 3, None, None, 4]
+        actual = indexer.first_events_at(the_stream, offsets)
+        self.assertSequenceEqual(expected, [None if x is None else x.obj for x in actual])
+        for i, offset in enumerate(offsets):
+            found = list(the_stream.getElementsByOffset(offset, mustBeginInSpan=False))
+            self.assertIs(found[0] if found else None, actual[i])
+
+    def test_flat_events_1(self):
+        # that the flattened Stream is remembered, and forgotten when the Part changes
+        the_part = stream.Part()
+        for i in xrange(4):
+            the_measure = stream.Measure()
+            the_measure.append([note.Note(u'C4'), note.Rest()])
+            the_part.append(the_measure)
+        actual = indexer.flat_events(the_part, [note.Note])
+        self.assertEqual(4, len(actual))
+        self.assertIs(actual, indexer.flat_events(the_part, [note.Note]))
+        self.assertEqual(8, len(indexer.flat_events(the_part, [note.Note, note.Rest])))
+        self.assertIs(actual, indexer.flat_events(the_part, [note.Note]))
+        the_measure.append(note.Note(u'D4'))
+        actual = indexer.flat_events(the_part, [note.Note])
+        self.assertEqual(5, len(actual))
+
 
 class TestMpiUniqueOffsets(unittest.TestCase):
     def test_mpi_unique_offsets_1(self):
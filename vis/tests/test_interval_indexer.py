@@ -34,7 +34,8 @@ from numpy import nan
 import pandas
 from music21 import interval, note
 from vis.analyzers.indexers.interval import IntervalIndexer, HorizontalIntervalIndexer, \
-    real_indexer, key_to_tuple, interval_to_int
+    real_indexer, key_to_tuple, interval_to_int, nq_series_indexer, nq_score_indexer, \
+    q_score_indexer
 from vis.tests.test_note_rest_indexer import TestNoteRestIndexer
 
 
@@ -640,6 +641,48 @@ class TestIntervalIndexerIndexer(unittest.TestCase):
         actual = real_indexer(notes, quality=True, simple=True)
         self.assertEqual(expected, actual)
 
+    def test_nq_series_indexer_1(self):
+        # compound; with a crossing, a Rest, and an offset only in one part
+        upper = pandas.Series([u'E5', u'C4', u'Rest', u'G4'], index=[0.0, 1.0, 2.0, 3.0])
+        lower = pandas.Series([u'C4', u'E4', u'C4'], index=[0.0, 1.0, 2.5])
+        expected = pandas.Series([u'10', u'-3', u'Rest', u'Rest', u'5'],
+                                 index=[0.0, 1.0, 2.0, 2.5, 3.0])
+        actual = nq_series_indexer([upper, lower], False)
+        self.assertSequenceEqual(list(expected.index), list(actual.index))
+        self.assertSequenceEqual(list(expected), list(actual))
+
+    def test_nq_series_indexer_2(self):
+        # simple; octaves stay 8 but larger intervals are reduced
+        upper = pandas.Series([u'C5', u'C6', u'E5', u'C4'])
+        lower = pandas.Series([u'C4', u'C4', u'C4', u'E5'])
+        expected = [u'8', u'1', u'3', u'-3']
+        actual = nq_series_indexer([upper, lower], True)
+        self.assertSequenceEqual(expected, list(actual))
+
+    def test_nq_score_indexer_1(self):
+        # by tones, both compound and simple, with a Rest
+        parts = [pandas.Series([u'E5', u'C4', u'Rest']), pandas.Series([u'C4', u'E4', u'C4'])]
+        actual = nq_score_indexer(parts, [[0, 1], [1, 0]], False, True)
+        self.assertSequenceEqual([8.0, -2.0, u'Rest'], list(actual[0]))
+        self.assertSequenceEqual([-8.0, 2.0, u'Rest'], list(actual[1]))
+        actual = nq_score_indexer(parts, [[0, 1], [1, 0]], True, True)
+        self.assertSequenceEqual([2.0, -2.0, u'Rest'], list(actual[0]))
+        self.assertSequenceEqual([-2.0, 2.0, u'Rest'], list(actual[1]))
+
+    def test_q_score_indexer_1(self):
+        # the same interval from different notes, a diminished second (with no direction in
+        # semitones), and a Rest
+        parts = [pandas.Series([u'E5', u'F#4', u'C4', u'Rest']),
+                 pandas.Series([u'C4', u'D4', u'B#3', u'C4'])]
+        calls = []
+        def indexer_func(pair):
+            calls.append(pair)
+            return real_indexer(pair, False, True)
+        actual = q_score_indexer(parts, [[0, 1], [1, 0]], indexer_func)
+        self.assertSequenceEqual([u'M10', u'M3', u'd2', u'Rest'], list(actual[0]))
+        self.assertSequenceEqual([u'-M10', u'-M3', u'd2', u'Rest'], list(actual[1]))
+        self.assertEqual(6, len(calls))
+
     def test_interval_to_int_1(self):
         expected = 3
         actual = interval_to_int('M3')
@@ -687,6 +730,11 @@ class TestIntervalIndexerIndexer(unittest.TestCase):
         actual = interval_to_int('t')
         self.assertEqual(expected, actual)
 
+    def test_interval_to_int_10(self):
+        # numbers other than NaN aren't intervals, so they're an error rather than a wrong result
+        for interv in [3.0, 5, -2]:
+            self.assertRaises(TypeError, interval_to_int, interv)
+
 
 class TestHorizIntervalIndexerLong(unittest.TestCase):
     # data_interval_indexer_1.csv
@@ -175,6 +175,23 @@ class TestPartNotesIndexer(unittest.TestCase):
         self.assertEqual(len(expected), len(actual))
         self.assertSequenceEqual(expected, actual)
 
+    def test_fsbo_10(self):
+        # longer than the recursion limit allowed in the old recursive solution
+        # pylint: disable=W0212
+        in_1 = 0.0
+        in_2 = 8002.5
+        expected = [4.0] * 2000 + [2.0, 0.5]
+        actual = lilypond.PartNotesIndexer._fill_space_between_offsets(in_1, in_2)
+        self.assertEqual(len(expected), len(actual))
+        self.assertSequenceEqual(expected, actual)
+
+    def test_fsbo_11(self):
+        # pylint: disable=W0212
+        in_1 = 0.0
+        in_2 = 4.001
+        self.assertRaises(RuntimeError, lilypond.PartNotesIndexer._fill_space_between_offsets,
+                          in_1, in_2)
+
     def test_set_durations_1(self):
         # when only one object is required (i.e., the notes are enough)
         # --> has lily_analysis_voice
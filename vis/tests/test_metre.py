@@ -33,9 +33,9 @@
 import unittest
 import mock
 import pandas
-from music21 import base, note, stream
+from music21 import base, converter, note, stream
 from music21 import meter as m21_meter
-from vis.analyzers.indexers import metre
+from vis.analyzers.indexers import metre, noterest
 
 
 class TestBeatStrengthIndexer(unittest.TestCase):
@@ -71,9 +71,92 @@ class TestBeatStrengthIndexer(unittest.TestCase):
             self.assertTrue(key in actual)
             self.assertSequenceEqual(list(expected[key].index), list(actual[key].index))
             self.assertSequenceEqual(list(expected[key]), list(actual[key]))
+            self.assertEqual('float32', actual[key].dtype)
+
+    def test_beat_strengths_1(self):
+        # beat_strengths() agrees with music21, in Measures and with a change of TimeSignature
+        some_part = stream.Part()
+        for i, ratio in enumerate(['3/4', '3/4', '6/8', '6/8']):
+            a_meas = stream.Measure(number=i + 1)
+            if 0 == i or 2 == i:
+                a_meas.timeSignature = m21_meter.TimeSignature(ratio)
+            a_meas.append(note.Note(quarterLength=0.5))
+            a_meas.append(note.Rest(quarterLength=1.0))
+            a_meas.append(note.Note(quarterLength=1.5))
+            some_part.append(a_meas)
+        actual = metre.beat_strengths(some_part)
+        some_notes = list(some_part.flat.notesAndRests)
+        self.assertEqual(len(some_notes), len(actual))
+        for each_note in some_notes:
+            self.assertEqual(each_note.beatStrength, actual[id(each_note)])
+        # the accent weights are kept in the dict given, one entry for each TimeSignature
+        accent_weights = {}
+        self.assertEqual(actual, metre.beat_strengths(some_part, accent_weights))
+        self.assertEqual(2, len(accent_weights))
+
+    def test_run_1(self):
+        # run() and run_fused() restore the usual indexer function even if indexing fails
+        some_part = stream.Part([m21_meter.TimeSignature('3/4'), note.Note(quarterLength=0.5)])
+        test_ind = metre.NoteBeatStrengthIndexer([some_part])
+        with mock.patch.object(test_ind, u'_do_multiprocessing', side_effect=RuntimeError):
+            for method in (test_ind.run, test_ind.run_fused):
+                self.assertRaises(RuntimeError, method)
+                self.assertIs(metre.beatstrength_ind_func, test_ind._indexer_func)
+
+    def test_run_fused_1(self):
+        # run_fused() gives the same results as NoteRestIndexer and NoteBeatStrengthIndexer
+        some_part = stream.Part([m21_meter.TimeSignature('3/4')])
+        some_part.repeatAppend(note.Note(u'G4', quarterLength=0.5), 5)
+        some_part.repeatAppend(note.Rest(quarterLength=0.5), 5)
+        other_part = stream.Part([m21_meter.TimeSignature('3/4')])
+        other_part.repeatAppend(note.Note(u'C4', quarterLength=1.5), 3)
+        expected = pandas.concat([noterest.NoteRestIndexer([some_part, other_part]).run(),
+                                  metre.NoteBeatStrengthIndexer([some_part, other_part]).run()],
+                                 axis=1)
+        actual = metre.NoteBeatStrengthIndexer([some_part, other_part]).run_fused()
+        self.assertSequenceEqual(list(expected.columns), list(actual.columns))
+        self.assertSequenceEqual(list(expected.index), list(actual.index))
+        for column in expected.columns:
+            # NB: unicode() so that NaN equals NaN
+            self.assertSequenceEqual([unicode(x) for x in expected[column]],
+                                     [unicode(x) for x in actual[column]])
+
+    def test_run_batch_1(self):
+        # run_batch() gives the same results as run(), in the same order as the files
+        pathnames = [u'vis/tests/corpus/bwv77.mxl', u'vis/tests/corpus/Jos2308.krn',
+                     u'vis/tests/corpus/bwv77.mxl']
+        actual = metre.NoteBeatStrengthIndexer.run_batch(pathnames, 2)
+        self.assertEqual(len(pathnames), len(actual))
+        for pathname, result in zip(pathnames, actual):
+            expected = metre.NoteBeatStrengthIndexer(converter.parse(pathname)).run()
+            self.assertSequenceEqual(list(expected.columns), list(result.columns))
+            self.assertSequenceEqual(list(expected.index), list(result.index))
+            for column in expected.columns:
+                self.assertSequenceEqual([unicode(x) for x in expected[column]],
+                                         [unicode(x) for x in result[column]])
+
+
+class TestTimeSignatureIndexer(unittest.TestCase):
+    def test_ind_func_1(self):
+        # timeSignature_ind_func() gives the same string object for equal TimeSignatures
+        expected = '3/4'
+        actual_1 = metre.timeSignature_ind_func([m21_meter.TimeSignature('3/4')])
+        actual_2 = metre.timeSignature_ind_func([m21_meter.TimeSignature('3/4')])
+        self.assertEqual(expected, actual_1)
+        self.assertIs(actual_1, actual_2)
+
+    def test_indexer_1(self):
+        # Test the whole indexer, with a change of TimeSignature
+        some_part = stream.Part([m21_meter.TimeSignature('3/4')])
+        some_part.repeatAppend(note.Note(quarterLength=1.0), 6)
+        some_part.insert(3.0, m21_meter.TimeSignature('6/8'))
+        actual = metre.TimeSignatureIndexer([some_part]).run()['metre.TimeSignatureIndexer']['0']
+        self.assertSequenceEqual([0.0, 3.0], list(actual.index))
+        self.assertSequenceEqual(['3/4', '6/8'], list(actual))
 
 
 #--------------------------------------------------------------------------------------------------#
 # Definitions                                                                                      #
 #--------------------------------------------------------------------------------------------------#
 BEATSTRENGTH_INDEXER_SUITE = unittest.TestLoader().loadTestsFromTestCase(TestBeatStrengthIndexer)
+TIME_SIGNATURE_INDEXER_SUITE = unittest.TestLoader().loadTestsFromTestCase(TestTimeSignatureIndexer)
@@ -29,21 +29,55 @@ Tests for the WorkflowManager
 """
 
 import os
+import shutil
 from subprocess import CalledProcessError
-from unittest import TestCase, TestLoader
+import tempfile
+from unittest import TestCase, TestLoader, skipIf
 import mock
 from mock import MagicMock
+from numpy import arange
 import pandas
+from pandas.util.testing import assert_frame_equal
 from music21.humdrum.spineParser import GlobalReference
-from vis.workflow import WorkflowManager
+from vis.workflow import WorkflowManager, _EXCEL_KWARGS, _file_size
 from vis.models.indexed_piece import IndexedPiece
-from vis.analyzers.indexers import noterest, lilypond
+from vis.analyzers.indexers import noterest, interval, lilypond
+
+# Used by WorkflowTests.test_load_7(), which needs PyTables to write and read an HDF5 file.
+try:
+    import tables  # pylint: disable=unused-import
+    _HAVE_TABLES = True
+except ImportError:
+    _HAVE_TABLES = False
+
+# Used by Export.test_export_7() and Export.test_export_8(), for the XlsxWriter Excel engine.
+try:
+    import xlsxwriter  # pylint: disable=unused-import
+    _HAVE_XLSXWRITER = True
+except ImportError:
+    _HAVE_XLSXWRITER = False
 
 
 # pylint: disable=R0904
 # pylint: disable=C0111
 class WorkflowTests(TestCase):
     # NB: this class is just for __init__(), load(), and run() (without the run() helper methods)
+
+    # the "shared settings" every new WorkflowManager should have
+    _EXP_SH_SETTS = {u'n': 2, u'continuer': 'dynamic quality', u'mark singles': False,
+                     u'interval quality': False, u'simple intervals': False,
+                     u'include rests': False, u'count frequency': True}
+
+    def _check_default_settings(self, test_wc):
+        # that "test_wc" has the default settings, for each piece and shared
+        for piece_sett in test_wc._settings:
+            self.assertEqual(3, len(piece_sett))
+            for sett in [u'offset interval', u'voice combinations']:
+                self.assertEqual(None, piece_sett[sett])
+            for sett in [u'filter repeats']:
+                self.assertEqual(False, piece_sett[sett])
+        self.assertEqual(WorkflowTests._EXP_SH_SETTS, test_wc._shared_settings)
+
     @mock.patch('vis.workflow.path.join', return_value='/some/vis/path.r')
     def test_init_1(self, mock_join):
         # with a list of basestrings
@@ -58,16 +92,7 @@ class WorkflowTests(TestCase):
             for each in test_wc._data:
                 self.assertTrue(isinstance(each, mock.MagicMock))
             self.assertEqual(3, len(test_wc._settings))
-            for piece_sett in test_wc._settings:
-                self.assertEqual(3, len(piece_sett))
-                for sett in [u'offset interval', u'voice combinations']:
-                    self.assertEqual(None, piece_sett[sett])
-                for sett in [u'filter repeats']:
-                    self.assertEqual(False, piece_sett[sett])
-            exp_sh_setts = {u'n': 2, u'continuer': 'dynamic quality', u'mark singles': False,
-                            u'interval quality': False, u'simple intervals': False,
-                            u'include rests': False, u'count frequency': True}
-            self.assertEqual(exp_sh_setts, test_wc._shared_settings)
+            self._check_default_settings(test_wc)
             self.assertEqual(1, mock_join.call_count)
 
     @mock.patch('vis.workflow.vis')
@@ -82,16 +107,7 @@ class WorkflowTests(TestCase):
         self.assertEqual(3, len(test_wc._data))
         for each in test_wc._data:
             self.assertTrue(each in in_val)
-        for piece_sett in test_wc._settings:
-            self.assertEqual(3, len(piece_sett))
-            for sett in [u'offset interval', u'voice combinations']:
-                self.assertEqual(None, piece_sett[sett])
-            for sett in [u'filter repeats']:
-                self.assertEqual(False, piece_sett[sett])
-        exp_sh_setts = {u'n': 2, u'continuer': 'dynamic quality', u'mark singles': False,
-                        u'interval quality': False, u'simple intervals': False,
-                        u'include rests': False, u'count frequency': True}
-        self.assertEqual(exp_sh_setts, test_wc._shared_settings)
+        self._check_default_settings(test_wc)
         self.assertEqual(exp_chart_path, test_wc._R_bar_chart_path)
 
     def test_init_3(self):
@@ -103,16 +119,7 @@ class WorkflowTests(TestCase):
         self.assertEqual(in_val[0], test_wc._data[0])
         for each in test_wc._data[1:]:
             self.assertTrue(isinstance(each, IndexedPiece))
-        for piece_sett in test_wc._settings:
-            self.assertEqual(3, len(piece_sett))
-            for sett in [u'offset interval', u'voice combinations']:
-                self.assertEqual(None, piece_sett[sett])
-            for sett in [u'filter repeats']:
-                self.assertEqual(False, piece_sett[sett])
-        exp_sh_setts = {u'n': 2, u'continuer': 'dynamic quality', u'mark singles': False,
-                        u'interval quality': False, u'simple intervals': False,
-                        u'include rests': False, u'count frequency': True}
-        self.assertEqual(exp_sh_setts, test_wc._shared_settings)
+        self._check_default_settings(test_wc)
         self.assertTrue(os.path.exists(test_wc._R_bar_chart_path))
 
     def test_init_4(self):
@@ -122,22 +129,13 @@ class WorkflowTests(TestCase):
         self.assertEqual(3, len(test_wc._data))
         for each in test_wc._data:
             self.assertTrue(isinstance(each, IndexedPiece))
-        for piece_sett in test_wc._settings:
-            self.assertEqual(3, len(piece_sett))
-            for sett in [u'offset interval', u'voice combinations']:
-                self.assertEqual(None, piece_sett[sett])
-            for sett in [u'filter repeats']:
-                self.assertEqual(False, piece_sett[sett])
-        exp_sh_setts = {u'n': 2, u'continuer': 'dynamic quality', u'mark singles': False,
-                        u'interval quality': False, u'simple intervals': False,
-                        u'include rests': False, u'count frequency': True}
-        self.assertEqual(exp_sh_setts, test_wc._shared_settings)
+        self._check_default_settings(test_wc)
 
     def test_load_1(self):
         # that "get_data" is called correctly on each thing
         test_wc = WorkflowManager([])
         test_wc._data = [mock.MagicMock(spec=IndexedPiece) for _ in xrange(5)]
-        test_wc.load(u'pieces')
+        test_wc.load(u'pieces', n_procs=1)  # mocks can't be sent to worker processes
         for mock_piece in test_wc._data:
             mock_piece.get_data.assert_called_once_with([noterest.NoteRestIndexer])
         self.assertTrue(test_wc._loaded)
@@ -145,9 +143,8 @@ class WorkflowTests(TestCase):
     def test_load_2(self):
         # that the not-yet-implemented instructions raise NotImplementedError
         test_wc = WorkflowManager([])
-        self.assertRaises(NotImplementedError, test_wc.load, u'hdf5')
-        self.assertRaises(NotImplementedError, test_wc.load, u'stata')
-        self.assertRaises(NotImplementedError, test_wc.load, u'pickle')
+        for instruction in [u'stata', u'pickle']:
+            self.assertRaises(NotImplementedError, test_wc.load, instruction)
 
     def test_load_3(self):
         # NB: this is more of an integration test
@@ -172,9 +169,60 @@ class WorkflowTests(TestCase):
     def test_load_4(self):
         # that incorrect instructions cause load() to raise a RuntimeError
         test_wc = WorkflowManager([])
-        self.assertRaises(RuntimeError, test_wc.load, u'piece')
-        self.assertRaises(RuntimeError, test_wc.load, u'all the data')
-        self.assertRaises(RuntimeError, test_wc.load, u'not sure why I wanted three of these')
+        for instruction in [u'piece', u'all the data', u'not sure why I wanted three of these']:
+            self.assertRaises(RuntimeError, test_wc.load, instruction)
+
+    def test_load_5(self):
+        # that importing with a process pool gives the same results as importing serially, keeps
+        # the same IndexedPiece objects, and still expands an Opus
+        # NB: this is more of an integration test
+        pathnames = [u'vis/tests/corpus/Kyrie_short.krn', u'vis/tests/corpus/try_opus.krn',
+                     u'vis/tests/corpus/bwv77.mxl']
+        serial_wm = WorkflowManager(pathnames)
+        serial_wm.load(u'pieces', n_procs=1)
+        pool_wm = WorkflowManager(pathnames)
+        first_piece = pool_wm[0]
+        pool_wm.load(u'pieces', n_procs=2)
+        self.assertIs(first_piece, pool_wm[0])
+        self.assertEqual(len(serial_wm), len(pool_wm))
+        for i in xrange(len(serial_wm)):
+            self.assertEqual(serial_wm.metadata(i, u'title'), pool_wm.metadata(i, u'title'))
+            expected = serial_wm[i].get_data([noterest.NoteRestIndexer])
+            actual = pool_wm[i].get_data([noterest.NoteRestIndexer])
+            assert_frame_equal(expected, actual)
+
+    @mock.patch(u'vis.workflow.pandas.read_hdf')
+    def test_load_6(self, mock_read):
+        # that the "hdf5" instruction reads the results saved by export(), and requires a pathname
+        test_wc = WorkflowManager([])
+        self.assertRaises(RuntimeError, test_wc.load, u'hdf5')
+        self.assertEqual(0, mock_read.call_count)
+        test_wc.load(u'hdf5', u'results.h5')
+        mock_read.assert_called_once_with(u'results.h5', WorkflowManager._HDF5_KEY)
+        self.assertIs(mock_read.return_value, test_wc._result)
+
+    def test_file_size_1(self):
+        # that _file_size() gives the size of a file, and 0 for a missing file or a pathname that
+        # isn't a string, so sorting the pieces for the process pool can't fail
+        pathname = u'vis/tests/corpus/bwv77.mxl'
+        self.assertEqual(os.path.getsize(pathname), _file_size(IndexedPiece(pathname)))
+        self.assertEqual(0, _file_size(IndexedPiece(u'vis/tests/corpus/no_such_file.krn')))
+        test_piece = IndexedPiece(pathname)
+        test_piece.metadata(u'pathname', 42)
+        self.assertEqual(0, _file_size(test_piece))
+
+    @skipIf(not _HAVE_TABLES, u'PyTables is not installed')
+    def test_load_7(self):
+        # that load(u'hdf5') reads back what export(u'HDF5') wrote, for a unicode-indexed result
+        # NB: this is more of an integration test
+        out_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, out_dir)
+        exp_wm = WorkflowManager([])
+        exp_wm._result = pandas.Series([5, 3, 1], index=[u'P5', u'M3', u'3 +2 4'])
+        pathname = exp_wm.export(u'HDF5', os.path.join(out_dir, u'results'))
+        load_wm = WorkflowManager([])
+        load_wm.load(u'hdf5', pathname)
+        assert_frame_equal(exp_wm._get_dataframe(u'data'), load_wm._result)
 
     def test_run_1(self):
         # properly deals with "intervals" experiment
@@ -252,7 +300,7 @@ class Output(TestCase):
         mock_histo.return_value = histo_path
         test_wc = WorkflowManager([])
         test_wc._previous_exp = u'intervals'
-        test_wc._data = [1 for _ in xrange(20)]
+        test_wc._data = [1] * 20
         test_wc._result = MagicMock(spec=pandas.DataFrame)
         path = u'pathname!'
         top_x = 20
@@ -272,7 +320,7 @@ class Output(TestCase):
         mock_histo.return_value = histo_path
         test_wc = WorkflowManager([])
         test_wc._previous_exp = u'intervals'
-        test_wc._data = [1 for _ in xrange(20)]
+        test_wc._data = [1] * 20
         test_wc._result = MagicMock(spec=pandas.DataFrame)
         path = u'pathname!'
         top_x = 20
@@ -292,7 +340,7 @@ class Output(TestCase):
         mock_lily.return_value = lily_path
         test_wc = WorkflowManager([])
         test_wc._previous_exp = u'intervals'
-        test_wc._data = [1 for _ in xrange(20)]
+        test_wc._data = [1] * 20
         test_wc._result = MagicMock(spec=pandas.DataFrame)
         path = u'pathname!'
         expected_args = [path]
@@ -314,26 +362,34 @@ class Output(TestCase):
         self.assertRaises(RuntimeError, test_wc.output, u'R histogram')
 
 
-@mock.patch('vis.workflow.path.join', return_value='hello')
-@mock.patch(u'vis.workflow.WorkflowManager._get_dataframe')
-@mock.patch(u'subprocess.check_output')
 class MakeHistogram(TestCase):
-    def test_histogram_1(self, mock_call, mock_gdf, mock_join):
+    def setUp(self):
+        patchers = [mock.patch(u'subprocess.check_output'),
+                    mock.patch(u'vis.workflow.WorkflowManager._get_dataframe'),
+                    mock.patch('vis.workflow.path.join', return_value='hello')]
+        self.mock_call, self.mock_gdf, self.mock_join = [patcher.start() for patcher in patchers]
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+
+    def _expected_args(self, path, token, num_pieces):
+        # the command _make_histogram() should use to call R
+        return [u'Rscript', u'--vanilla', self.mock_join.return_value,
+                path + u'.dta', path + u'.png', token, num_pieces]
+
+    def test_histogram_1(self):
         # with specified pathname; last experiment was intervals with 20 pieces; self._result is DF
         test_wc = WorkflowManager([])
         test_wc._previous_exp = u'intervals'
-        test_wc._data = [1 for _ in xrange(20)]
+        test_wc._data = [1] * 20
         test_wc._result = MagicMock(spec=pandas.DataFrame)
         path = u'pathname!'
         actual = test_wc._make_histogram(path)
-        self.assertEqual(0, mock_gdf.call_count)
-        expected_args = [u'Rscript', u'--vanilla', mock_join.return_value,
-                         path + u'.dta', path + u'.png', u'int', u'20']
-        mock_call.assert_called_once_with(expected_args)
+        self.assertEqual(0, self.mock_gdf.call_count)
+        self.mock_call.assert_called_once_with(self._expected_args(path, u'int', u'20'))
         self.assertEqual(path + u'.png', actual)
-        self.assertEqual(1, mock_join.call_count)
+        self.assertEqual(1, self.mock_join.call_count)
 
-    def test_histogram_2(self, mock_call, mock_gdf, mock_join):
+    def test_histogram_2(self):
         # with unspecified pathname; last experiment was 14-grams with 1 piece; self._result is S
         test_wc = WorkflowManager([])
         test_wc._previous_exp = u'n-grams'
@@ -342,14 +398,12 @@ class MakeHistogram(TestCase):
         test_wc._result = MagicMock(spec=pandas.Series)
         path = u'test_output/output_result'
         actual = test_wc._make_histogram()
-        mock_gdf.assert_called_once_with(u'freq', None, None)
-        expected_args = [u'Rscript', u'--vanilla', mock_join.return_value,
-                         path + u'.dta', path + u'.png', u'14', u'1']
-        mock_call.assert_called_once_with(expected_args)
+        self.mock_gdf.assert_called_once_with(u'freq', None, None)
+        self.mock_call.assert_called_once_with(self._expected_args(path, u'14', u'1'))
         self.assertEqual(path + u'.png', actual)
-        self.assertEqual(1, mock_join.call_count)
+        self.assertEqual(1, self.mock_join.call_count)
 
-    def test_histogram_3(self, mock_call, mock_gdf, mock_join):
+    def test_histogram_3(self):
         # test_ouput_6, plus top_x and threshold
         test_wc = WorkflowManager([])
         test_wc._previous_exp = u'n-grams'
@@ -358,21 +412,19 @@ class MakeHistogram(TestCase):
         test_wc._result = MagicMock(spec=pandas.Series)
         path = u'test_output/output_result'
         actual = test_wc._make_histogram(top_x=420, threshold=1987)
-        mock_gdf.assert_called_once_with(u'freq', 420, 1987)
-        expected_args = [u'Rscript', u'--vanilla', mock_join.return_value,
-                         path + u'.dta', path + u'.png', u'14', u'1']
-        mock_call.assert_called_once_with(expected_args)
+        self.mock_gdf.assert_called_once_with(u'freq', 420, 1987)
+        self.mock_call.assert_called_once_with(self._expected_args(path, u'14', u'1'))
         self.assertEqual(path + u'.png', actual)
-        self.assertEqual(1, mock_join.call_count)
+        self.assertEqual(1, self.mock_join.call_count)
 
-    def test_histogram_4(self, mock_call, mock_gdf, mock_join):
+    def test_histogram_4(self):
         # test_output_4() but the subprocess thing fails
         def raiser(*args):
             raise CalledProcessError(u'Bach!', 42, u'CPE')
-        mock_call.side_effect = raiser
+        self.mock_call.side_effect = raiser
         test_wc = WorkflowManager([])
         test_wc._previous_exp = u'intervals'
-        test_wc._data = [1 for _ in xrange(20)]
+        test_wc._data = [1] * 20
         test_wc._result = MagicMock(spec=pandas.DataFrame)
         path = u'pathname!'
         expected_msg = u'Error during call to R: CPE (return code: Bach!)'
@@ -382,11 +434,9 @@ class MakeHistogram(TestCase):
         except RuntimeError as run_e:
             actual = run_e
         self.assertEqual(expected_msg, actual.message)
-        self.assertEqual(0, mock_gdf.call_count)
-        expected_args = [u'Rscript', u'--vanilla', mock_join.return_value,
-                         path + u'.dta', path + u'.png', u'int', u'20']
-        mock_call.assert_called_once_with(expected_args)
-        self.assertEqual(1, mock_join.call_count)
+        self.assertEqual(0, self.mock_gdf.call_count)
+        self.mock_call.assert_called_once_with(self._expected_args(path, u'int', u'20'))
+        self.assertEqual(1, self.mock_join.call_count)
 
 
 class MakeLilyPond(TestCase):
@@ -541,82 +591,70 @@ class MakeLilyPond(TestCase):
 
 
 class Settings(TestCase):
-    @mock.patch(u'vis.models.indexed_piece.IndexedPiece')
-    def test_settings_1(self, mock_ip):
+    def setUp(self):
+        patcher = mock.patch(u'vis.models.indexed_piece.IndexedPiece')
+        self.mock_ip = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.test_wm = WorkflowManager([u'a', u'b', u'c'])
+        self.assertEqual(3, self.mock_ip.call_count)  # make sure we're using the mock, not real IP
+
+    def test_settings_1(self):
         # - if index is None and value are None, raise ValueError
-        test_wm = WorkflowManager([u'a', u'b', u'c'])
-        self.assertEqual(3, mock_ip.call_count)  # to make sure we're using the mock, not real IP
-        self.assertRaises(ValueError, test_wm.settings, None, u'filter repeats', None)
-        self.assertRaises(ValueError, test_wm.settings, None, u'filter repeats')
+        self.assertRaises(ValueError, self.test_wm.settings, None, u'filter repeats', None)
+        self.assertRaises(ValueError, self.test_wm.settings, None, u'filter repeats')
 
-    @mock.patch(u'vis.models.indexed_piece.IndexedPiece')
-    def test_settings_2(self, mock_ip):
+    def test_settings_2(self):
         # - if index is None, field and value are valid, it'll set for all IPs
-        test_wm = WorkflowManager([u'a', u'b', u'c'])
-        self.assertEqual(3, mock_ip.call_count)  # to make sure we're using the mock, not real IP
-        test_wm.settings(None, u'filter repeats', True)
+        self.test_wm.settings(None, u'filter repeats', True)
         for i in xrange(3):
-            self.assertEqual(True, test_wm._settings[i][u'filter repeats'])
+            self.assertEqual(True, self.test_wm._settings[i][u'filter repeats'])
 
-    @mock.patch(u'vis.models.indexed_piece.IndexedPiece')
-    def test_settings_3(self, mock_ip):
+    def test_settings_3(self):
         # - if index is less than 0 or greater-than-valid, raise IndexError
-        test_wm = WorkflowManager([u'a', u'b', u'c'])
-        self.assertEqual(3, mock_ip.call_count)  # to make sure we're using the mock, not real IP
-        self.assertRaises(IndexError, test_wm.settings, -1, u'filter repeats')
-        self.assertRaises(IndexError, test_wm.settings, 20, u'filter repeats')
+        self.assertRaises(IndexError, self.test_wm.settings, -1, u'filter repeats')
+        self.assertRaises(IndexError, self.test_wm.settings, 20, u'filter repeats')
 
-    @mock.patch(u'vis.models.indexed_piece.IndexedPiece')
-    def test_settings_4(self, mock_ip):
+    def test_settings_4(self):
         # - if index is 0, return proper setting
-        test_wm = WorkflowManager([u'a', u'b', u'c'])
-        self.assertEqual(3, mock_ip.call_count)  # to make sure we're using the mock, not real IP
-        test_wm._settings[0][u'filter repeats'] = u'cheese'
-        self.assertEqual(u'cheese', test_wm.settings(0, u'filter repeats'))
+        self.test_wm._settings[0][u'filter repeats'] = u'cheese'
+        self.assertEqual(u'cheese', self.test_wm.settings(0, u'filter repeats'))
 
-    @mock.patch(u'vis.models.indexed_piece.IndexedPiece')
-    def test_settings_5(self, mock_ip):
+    def test_settings_5(self):
         # - if index is greater than 0 but valid, set proper setting
-        test_wm = WorkflowManager([u'a', u'b', u'c'])
-        self.assertEqual(3, mock_ip.call_count)  # to make sure we're using the mock, not real IP
-        test_wm.settings(1, u'filter repeats', u'leeks')
-        self.assertEqual(u'leeks', test_wm._settings[1][u'filter repeats'])
+        self.test_wm.settings(1, u'filter repeats', u'leeks')
+        self.assertEqual(u'leeks', self.test_wm._settings[1][u'filter repeats'])
 
-    @mock.patch(u'vis.models.indexed_piece.IndexedPiece')
-    def test_settings_6(self, mock_ip):
+    def test_settings_6(self):
         # - if index is valid but the setting isn't, raise AttributeError (with or without a value)
-        test_wm = WorkflowManager([u'a', u'b', u'c'])
-        self.assertEqual(3, mock_ip.call_count)  # to make sure we're using the mock, not real IP
-        self.assertRaises(AttributeError, test_wm.settings, 1, u'drink wine')
-        self.assertRaises(AttributeError, test_wm.settings, 1, u'drink wine', True)
+        self.assertRaises(AttributeError, self.test_wm.settings, 1, u'drink wine')
+        self.assertRaises(AttributeError, self.test_wm.settings, 1, u'drink wine', True)
 
-    @mock.patch(u'vis.models.indexed_piece.IndexedPiece')
-    def test_settings_7(self, mock_ip):
+    def test_settings_7(self):
         # - we can properly fetch a "shared setting"
-        test_wm = WorkflowManager([u'a', u'b', u'c'])
-        self.assertEqual(3, mock_ip.call_count)  # to make sure we're using the mock, not real IP
-        test_wm._shared_settings[u'n'] = 4000
-        self.assertEqual(4000, test_wm.settings(None, u'n'))
+        self.test_wm._shared_settings[u'n'] = 4000
+        self.assertEqual(4000, self.test_wm.settings(None, u'n'))
 
-    @mock.patch(u'vis.models.indexed_piece.IndexedPiece')
-    def test_settings_8(self, mock_ip):
+    def test_settings_8(self):
         # - we can properly set a "shared setting"
-        test_wm = WorkflowManager([u'a', u'b', u'c'])
-        self.assertEqual(3, mock_ip.call_count)  # to make sure we're using the mock, not real IP
-        test_wm.settings(None, u'n', 4000)
-        self.assertEqual(4000, test_wm._shared_settings[u'n'])
+        self.test_wm.settings(None, u'n', 4000)
+        self.assertEqual(4000, self.test_wm._shared_settings[u'n'])
 
-    @mock.patch(u'vis.models.indexed_piece.IndexedPiece')
-    def test_settings_9(self, mock_ip):
+    def test_settings_9(self):
         # - if trying to set 'offset interval' to 0, it should actually be set to None
-        test_wm = WorkflowManager([u'a', u'b', u'c'])
-        self.assertEqual(3, mock_ip.call_count)  # to make sure we're using the mock, not real IP
         # "None" is default value, so first set to non-zero
-        test_wm.settings(1, u'offset interval', 4.0)
-        self.assertEqual(4.0, test_wm._settings[1][u'offset interval'])
+        self.test_wm.settings(1, u'offset interval', 4.0)
+        self.assertEqual(4.0, self.test_wm._settings[1][u'offset interval'])
         # now run our test
-        test_wm.settings(1, u'offset interval', 0)
-        self.assertEqual(None, test_wm._settings[1][u'offset interval'])
+        self.test_wm.settings(1, u'offset interval', 0)
+        self.assertEqual(None, self.test_wm._settings[1][u'offset interval'])
+
+    def test_settings_10(self):
+        # - setting all pieces also turns an 'offset interval' of 0 into None, and checks the field
+        self.test_wm.settings(None, u'offset interval', 4.0)
+        self.test_wm.settings(None, u'offset interval', 0)
+        for i in xrange(3):
+            self.assertEqual(None, self.test_wm._settings[i][u'offset interval'])
+        self.assertRaises(AttributeError, self.test_wm.settings, None, u'drink wine', True)
 
 
 class ExtraPairs(TestCase):
@@ -655,6 +693,7 @@ class ExtraPairs(TestCase):
         expected = {'0,1': 1, '0,2': 2, '1,2': 3}
         actual = WorkflowManager._remove_extra_pairs(vert_ints, combos)
         self.assertSequenceEqual(expected, actual)
+        self.assertEqual(6, len(vert_ints))  # the argument isn't modified
 
     def test_extra_pairs_5(self):
         # --> when there are lots of pairs, only some of which are desired, and there are invalid
@@ -664,12 +703,28 @@ class ExtraPairs(TestCase):
         actual = WorkflowManager._remove_extra_pairs(vert_ints, combos)
         self.assertSequenceEqual(expected, actual)
 
+    def test_extra_pairs_6(self):
+        # --> with the DataFrame that IntervalIndexer really returns, keeps only the desired pairs
+        notes = pandas.DataFrame({u'0': pandas.Series([u'G4', u'A4', u'B4']),
+                                  u'1': pandas.Series([u'C4', u'D4', u'E4']),
+                                  u'2': pandas.Series([u'C3', u'D3', u'Rest'])})
+        vert_ints = interval.IntervalIndexer([notes[u'0'], notes[u'1'], notes[u'2']],
+                                             {u'quality': False,
+                                              u'simple or compound': u'compound'}).run()
+        self.assertEqual(3, len(vert_ints.columns))
+        actual = WorkflowManager._remove_extra_pairs(vert_ints, [[0, 2], [1, 2, 3], [1, 2]])
+        self.assertSequenceEqual([u'0,2', u'1,2'], [col[1] for col in actual.columns])
+        assert_frame_equal(vert_ints[[(u'interval.IntervalIndexer', u'0,2'),
+                                      (u'interval.IntervalIndexer', u'1,2')]], actual)
+        self.assertEqual(3, len(vert_ints.columns))  # the argument isn't modified
+        self.assertEqual(0, len(WorkflowManager._remove_extra_pairs(vert_ints, []).columns))
+
 
 class Export(TestCase):
     def test_export_1(self):
         # --> raise RuntimeError with unrecognized output format
         test_wm = WorkflowManager([])
-        test_wm._result = pandas.Series(xrange(100))
+        test_wm._result = pandas.Series(arange(100))
         self.assertRaises(RuntimeError, test_wm.export, u'PowerPoint')
 
     def test_export_2(self):
@@ -679,33 +734,35 @@ class Export(TestCase):
 
     @mock.patch(u'vis.workflow.WorkflowManager._get_dataframe')
     def test_export_3(self, mock_gdf):
-        # --> the method works as expected for CSV, Excel, and Stata when _result is a DataFrame
-        test_wm = WorkflowManager([])
-        test_wm._result = mock.MagicMock(spec=pandas.DataFrame)
-        test_wm.export(u'CSV', u'test_path')
-        test_wm.export(u'Excel', u'test_path')
-        test_wm.export(u'Stata', u'test_path')
-        test_wm.export(u'HTML', u'test_path')
-        test_wm._result.to_csv.assert_called_once_with(u'test_path.csv')
-        test_wm._result.to_stata.assert_called_once_with(u'test_path.dta')
-        test_wm._result.to_excel.assert_called_once_with(u'test_path.xlsx')
-        test_wm._result.to_html.assert_called_once_with(u'test_path.html')
+        # --> the method works as expected for CSV, Excel, and Stata when _result is a DataFrame,
+        #     both without and with a valid extension already on the pathname
+        for ext_csv, ext_xlsx, ext_dta, ext_html in [(u'', u'', u'', u''),
+                                                     (u'.csv', u'.xlsx', u'.dta', u'.html')]:
+            test_wm = WorkflowManager([])
+            test_wm._result = mock.MagicMock(spec=pandas.DataFrame)
+            test_wm.export(u'CSV', u'test_path' + ext_csv)
+            test_wm.export(u'Excel', u'test_path' + ext_xlsx)
+            test_wm.export(u'Stata', u'test_path' + ext_dta)
+            test_wm.export(u'HTML', u'test_path' + ext_html)
+            test_wm._result.to_csv.assert_called_once_with(u'test_path.csv')
+            test_wm._result.to_stata.assert_called_once_with(u'test_path.dta')
+            test_wm._result.to_excel.assert_called_once_with(u'test_path.xlsx',
+                                                             **_EXCEL_KWARGS)
+            test_wm._result.to_html.assert_called_once_with(u'test_path.html')
         self.assertEqual(0, mock_gdf.call_count)
 
-    @mock.patch(u'vis.workflow.WorkflowManager._get_dataframe')
-    def test_export_4(self, mock_gdf):
-        # --> test_export_3() with a valid extension already on
-        test_wm = WorkflowManager([])
-        test_wm._result = mock.MagicMock(spec=pandas.DataFrame)
-        test_wm.export(u'CSV', u'test_path.csv')
-        test_wm.export(u'Excel', u'test_path.xlsx')
-        test_wm.export(u'Stata', u'test_path.dta')
-        test_wm.export(u'HTML', u'test_path.html')
-        test_wm._result.to_csv.assert_called_once_with(u'test_path.csv')
-        test_wm._result.to_stata.assert_called_once_with(u'test_path.dta')
-        test_wm._result.to_excel.assert_called_once_with(u'test_path.xlsx')
-        test_wm._result.to_html.assert_called_once_with(u'test_path.html')
-        self.assertEqual(0, mock_gdf.call_count)
+    def test_export_4(self):
+        # --> HDF5 output is compressed, under the key that load() reads
+        for ext in [u'', u'.h5']:
+            test_wm = WorkflowManager([])
+            test_wm._result = mock.MagicMock(spec=pandas.DataFrame)
+            actual = test_wm.export(u'HDF5', u'test_path' + ext)
+            self.assertEqual(u'test_path.h5', actual)
+            test_wm._result.to_hdf.assert_called_once_with(u'test_path.h5',
+                                                           key=WorkflowManager._HDF5_KEY,
+                                                           mode='w',
+                                                           complib='blosc',
+                                                           complevel=5)
 
     @mock.patch(u'vis.workflow.WorkflowManager._get_dataframe')
     def test_export_5(self, mock_gdf):
@@ -721,7 +778,8 @@ class Export(TestCase):
         # Excel
         test_wm.export(u'Excel', u'test_path', 5)
         mock_gdf.assert_called_once_with(u'data', 5, None)
-        mock_gdf.return_value.to_excel.assert_called_once_with(u'test_path.xlsx')
+        mock_gdf.return_value.to_excel.assert_called_once_with(u'test_path.xlsx',
+                                                               **_EXCEL_KWARGS)
         mock_gdf.reset_mock()
         # Stata
         test_wm.export(u'Stata', u'test_path', 5, 10)
@@ -741,167 +799,181 @@ class Export(TestCase):
         #       vis.workflow.pandas.DataFrame
         pass
 
+    def test_export_7(self):
+        # --> Excel output uses XlsxWriter exactly when it can be imported
+        self.assertEqual({u'engine': u'xlsxwriter'} if _HAVE_XLSXWRITER else {}, _EXCEL_KWARGS)
+
+    @skipIf(not _HAVE_XLSXWRITER, u'XlsxWriter is not installed')
+    def test_export_8(self):
+        # --> Excel output really works with the XlsxWriter engine
+        # NB: this is more of an integration test
+        out_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, out_dir)
+        test_wm = WorkflowManager([])
+        test_wm._result = pandas.Series([5, 3, 1], index=[u'P5', u'M3', u'3 +2 4'])
+        pathname = test_wm.export(u'Excel', os.path.join(out_dir, u'results'))
+        with open(pathname, 'rb') as xlsx_file:
+            self.assertEqual('PK', xlsx_file.read(2))  # an .xlsx file is a ZIP archive
+
 
 class GetDataFrame(TestCase):
+    # _get_dataframe() doesn't modify self._result, so every test can use the same one
+    _RESULT = pandas.Series(arange(10, 0, -1))
+    _EXPECTED_TOP_3 = pandas.DataFrame({'data': pandas.Series([10, 9, 8])})
+
     def test_get_dataframe_1(self):
         # test with name=auto, top_x=auto, threshold=auto
         test_wc = WorkflowManager([])
-        test_wc._result = pandas.Series([i for i in xrange(10, 0, -1)])
-        expected = pandas.DataFrame({'data': pandas.Series([i for i in xrange(10, 0, -1)])})
+        test_wc._result = GetDataFrame._RESULT
+        expected = pandas.DataFrame({'data': GetDataFrame._RESULT})
         actual = test_wc._get_dataframe()
-        self.assertEqual(len(expected.columns), len(actual.columns))
-        for i in expected.columns:
-            self.assertSequenceEqual(list(expected.loc[:,i].index), list(actual.loc[:,i].index))
-            self.assertSequenceEqual(list(expected.loc[:,i].values), list(actual.loc[:,i].values))
+        assert_frame_equal(expected, actual)
 
     def test_get_dataframe_2(self):
         # test with name='asdf', top_x=3, threshold=auto
         test_wc = WorkflowManager([])
-        test_wc._result = pandas.Series([i for i in xrange(10, 0, -1)])
+        test_wc._result = GetDataFrame._RESULT
         expected = pandas.DataFrame({'asdf': pandas.Series([10, 9, 8])})
         actual = test_wc._get_dataframe('asdf', 3)
-        self.assertEqual(len(expected.columns), len(actual.columns))
-        for i in expected.columns:
-            self.assertSequenceEqual(list(expected.loc[:,i].index), list(actual.loc[:,i].index))
-            self.assertSequenceEqual(list(expected.loc[:,i].values), list(actual.loc[:,i].values))
+        assert_frame_equal(expected, actual)
 
     def test_get_dataframe_3(self):
         # test with name=auto, top_x=3, threshold=5 (so the top_x still removes after threshold)
         test_wc = WorkflowManager([])
-        test_wc._result = pandas.Series([i for i in xrange(10, 0, -1)])
-        expected = pandas.DataFrame({'data': pandas.Series([10, 9, 8])})
+        test_wc._result = GetDataFrame._RESULT
+        expected = GetDataFrame._EXPECTED_TOP_3
         actual = test_wc._get_dataframe(top_x=3, threshold=5)
-        self.assertEqual(len(expected.columns), len(actual.columns))
-        for i in expected.columns:
-            self.assertSequenceEqual(list(expected.loc[:,i].index), list(actual.loc[:,i].index))
-            self.assertSequenceEqual(list(expected.loc[:,i].values), list(actual.loc[:,i].values))
+        assert_frame_equal(expected, actual)
 
     def test_get_dataframe_4(self):
         # test with name=auto, top_x=5, threshold=7 (so threshold leaves fewer than 3 results)
         test_wc = WorkflowManager([])
-        test_wc._result = pandas.Series([i for i in xrange(10, 0, -1)])
-        expected = pandas.DataFrame({'data': pandas.Series([10, 9, 8])})
+        test_wc._result = GetDataFrame._RESULT
+        expected = GetDataFrame._EXPECTED_TOP_3
         actual = test_wc._get_dataframe(top_x=5, threshold=7)
-        self.assertEqual(len(expected.columns), len(actual.columns))
-        for i in expected.columns:
-            self.assertSequenceEqual(list(expected.loc[:,i].index), list(actual.loc[:,i].index))
-            self.assertSequenceEqual(list(expected.loc[:,i].values), list(actual.loc[:,i].values))
+        assert_frame_equal(expected, actual)
 
+    def test_get_dataframe_5(self):
+        # the same arguments reuse the DataFrame until self._result is replaced, even after calls
+        # with other arguments (as when output() and export() are called one after another)
+        test_wc = WorkflowManager([])
+        test_wc._result = GetDataFrame._RESULT
+        first = test_wc._get_dataframe(top_x=3)
+        self.assertIs(first, test_wc._get_dataframe(top_x=3))
+        self.assertIsNot(first, test_wc._get_dataframe(top_x=4))
+        self.assertIsNot(first, test_wc._get_dataframe(u'freq', 3))
+        self.assertIs(first, test_wc._get_dataframe(top_x=3))
+        test_wc._result = pandas.Series(arange(3))
+        actual = test_wc._get_dataframe(top_x=3)
+        assert_frame_equal(pandas.DataFrame({'data': test_wc._result}), actual)
 
-class AuxiliaryExperimentMethods(TestCase):
-    @mock.patch(u'vis.workflow.repeat.FilterByRepeatIndexer')
-    @mock.patch(u'vis.workflow.offset.FilterByOffsetIndexer')
-    def test_run_off_rep_1(self, mock_off, mock_rep):
-        # run neither indexer
-        # setup
-        workm = WorkflowManager(['', '', ''])
-        workm._data = [None, MagicMock(spec=IndexedPiece), None]
-        workm.settings(1, 'offset interval', 0)
-        workm.settings(1, 'filter repeats', False)
-        in_val = 42
-        # run
-        actual = workm._run_off_rep(1, in_val)
-        # test
-        self.assertEqual(in_val, actual)
-        self.assertEqual(0, workm._data[1].get_data.call_count)
 
-    @mock.patch(u'vis.workflow.repeat.FilterByRepeatIndexer')
-    @mock.patch(u'vis.workflow.offset.FilterByOffsetIndexer')
-    def test_run_off_rep_2(self, mock_off, mock_rep):
+class AuxiliaryExperimentMethods(TestCase):
+    def setUp(self):
+        patchers = [mock.patch(u'vis.workflow.offset.FilterByOffsetIndexer'),
+                    mock.patch(u'vis.workflow.repeat.FilterByRepeatIndexer')]
+        self.mock_off, self.mock_rep = [patcher.start() for patcher in patchers]
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+        self.workm = WorkflowManager(['', '', ''])
+        self.mock_piece = MagicMock(spec=IndexedPiece)
+        self.workm._data = [None, self.mock_piece, None]
+
+    def test_run_off_rep_1(self):
+        # run neither indexer; input an int, then a dict
+        for in_val in (42, {'b': 43, 'a': 42, 'c': 44}):
+            # setup
+            self.workm.settings(1, 'offset interval', 0)
+            self.workm.settings(1, 'filter repeats', False)
+            # run
+            actual = self.workm._run_off_rep(1, in_val)
+            # test
+            self.assertEqual(in_val, actual)
+            self.assertEqual(0, self.mock_piece.get_data.call_count)
+
+    def test_run_off_rep_2(self):
         # run offset indexer
         # setup
-        workm = WorkflowManager(['', '', ''])
-        workm._data = [None, MagicMock(spec=IndexedPiece), None]
-        workm._data[1].get_data.return_value = 24
-        workm.settings(1, 'offset interval', 0.5)
-        workm.settings(1, 'filter repeats', False)
+        self.mock_piece.get_data.return_value = 24
+        self.workm.settings(1, 'offset interval', 0.5)
+        self.workm.settings(1, 'filter repeats', False)
         in_val = 42
         # run
-        actual = workm._run_off_rep(1, in_val)
+        actual = self.workm._run_off_rep(1, in_val)
         # test
-        self.assertEqual(workm._data[1].get_data.return_value, actual)
-        workm._data[1].get_data.assert_called_once_with([mock_off], {'quarterLength': 0.5}, in_val)
+        self.assertEqual(self.mock_piece.get_data.return_value, actual)
+        self.mock_piece.get_data.assert_called_once_with([self.mock_off],
+                                                         {'quarterLength': 0.5},
+                                                         in_val)
 
-    @mock.patch(u'vis.workflow.repeat.FilterByRepeatIndexer')
-    @mock.patch(u'vis.workflow.offset.FilterByOffsetIndexer')
-    def test_run_off_rep_3(self, mock_off, mock_rep):
+    def test_run_off_rep_3(self):
         # run repeat indexer
         # setup
-        workm = WorkflowManager(['', '', ''])
-        workm._data = [None, MagicMock(spec=IndexedPiece), None]
-        workm._data[1].get_data.return_value = 24
-        workm.settings(1, 'offset interval', 0)
-        workm.settings(1, 'filter repeats', True)
+        self.mock_piece.get_data.return_value = 24
+        self.workm.settings(1, 'offset interval', 0)
+        self.workm.settings(1, 'filter repeats', True)
         in_val = 42
         # run
-        actual = workm._run_off_rep(1, in_val)
+        actual = self.workm._run_off_rep(1, in_val)
         # test
-        self.assertEqual(workm._data[1].get_data.return_value, actual)
-        workm._data[1].get_data.assert_called_once_with([mock_rep], {}, in_val)
+        self.assertEqual(self.mock_piece.get_data.return_value, actual)
+        self.mock_piece.get_data.assert_called_once_with([self.mock_rep], {}, in_val)
 
-    @mock.patch(u'vis.workflow.repeat.FilterByRepeatIndexer')
-    @mock.patch(u'vis.workflow.offset.FilterByOffsetIndexer')
-    def test_run_off_rep_4(self, mock_off, mock_rep):
+    def test_run_off_rep_4(self):
         # run offset and repeat indexer
         # setup
-        workm = WorkflowManager(['', '', ''])
-        workm._data = [None, MagicMock(spec=IndexedPiece), None]
-        workm._data[1].get_data.return_value = 24
-        workm.settings(1, 'offset interval', 0.5)
-        workm.settings(1, 'filter repeats', True)
+        self.mock_piece.get_data.return_value = 24
+        self.workm.settings(1, 'offset interval', 0.5)
+        self.workm.settings(1, 'filter repeats', True)
         in_val = 42
         # run
-        actual = workm._run_off_rep(1, in_val)
+        actual = self.workm._run_off_rep(1, in_val)
         # test
-        self.assertEqual(workm._data[1].get_data.return_value, actual)
-        self.assertEqual(2, workm._data[1].get_data.call_count)
-        workm._data[1].get_data.assert_any_call([mock_off], {'quarterLength': 0.5}, in_val)
-        workm._data[1].get_data.assert_any_call([mock_rep], {}, workm._data[1].get_data.return_value)
-
-    @mock.patch(u'vis.workflow.repeat.FilterByRepeatIndexer')
-    @mock.patch(u'vis.workflow.offset.FilterByOffsetIndexer')
-    def test_run_off_rep_5(self, mock_off, mock_rep):
-        # run neither indexer; input a dict
-        # setup
-        workm = WorkflowManager(['', '', ''])
-        workm._data = [None, MagicMock(spec=IndexedPiece), None]
-        workm.settings(1, 'offset interval', 0)
-        workm.settings(1, 'filter repeats', False)
-        in_val = {'b': 43, 'a': 42, 'c': 44}
-        # run
-        actual = workm._run_off_rep(1, in_val)
-        # test
-        self.assertSequenceEqual(in_val, actual)
-        self.assertEqual(0, workm._data[1].get_data.call_count)
-
-    @mock.patch(u'vis.workflow.repeat.FilterByRepeatIndexer')
-    @mock.patch(u'vis.workflow.offset.FilterByOffsetIndexer')
-    def test_run_off_rep_6(self, mock_off, mock_rep):
+        self.assertEqual(self.mock_piece.get_data.return_value, actual)
+        self.assertEqual(2, self.mock_piece.get_data.call_count)
+        self.mock_piece.get_data.assert_any_call([self.mock_off],
+                                                 {'quarterLength': 0.5},
+                                                 in_val)
+        self.mock_piece.get_data.assert_any_call([self.mock_rep],
+                                                 {},
+                                                 self.mock_piece.get_data.return_value)
+
+    def test_run_off_rep_6(self):
         # run offset indexer with is_horizontal set to True
         # setup
-        workm = WorkflowManager(['', '', ''])
-        workm._data = [None, MagicMock(spec=IndexedPiece), None]
-        workm._data[1].get_data.return_value = 24
-        workm.settings(1, 'offset interval', 0.5)
-        workm.settings(1, 'filter repeats', False)
+        self.mock_piece.get_data.return_value = 24
+        self.workm.settings(1, 'offset interval', 0.5)
+        self.workm.settings(1, 'filter repeats', False)
         in_val = 42
         # run
-        actual = workm._run_off_rep(1, in_val, True)
+        actual = self.workm._run_off_rep(1, in_val, True)
         # test
-        self.assertEqual(workm._data[1].get_data.return_value, actual)
-        workm._data[1].get_data.assert_called_once_with([mock_off],
-                                                        {'quarterLength': 0.5, 'method': None},
-                                                        in_val)
+        self.assertEqual(self.mock_piece.get_data.return_value, actual)
+        self.mock_piece.get_data.assert_called_once_with([self.mock_off],
+                                                         {'quarterLength': 0.5, 'method': None},
+                                                         in_val)
+
+    def test_run_freq_agg_1(self):
+        # counts every voice pair of every piece together, whether the pairs are in a list or a
+        # dict, leaving out NaN
+        self.workm._result = [[pandas.Series([u'P5', u'M3', float('nan')]), pandas.Series([u'P5'])],
+                              {u'0,1': pandas.Series([u'M3', u'P5', u'P5']),
+                               u'0,2': pandas.Series([u'm6'])}]
+        actual = self.workm._run_freq_agg()
+        self.assertIs(actual, self.workm._result)
+        self.assertEqual({u'P5': 4, u'M3': 2, u'm6': 1}, dict(actual))
+        self.assertEqual(u'P5', actual.index[0])
 
 #-------------------------------------------------------------------------------------------------#
 # Definitions                                                                                     #
 #-------------------------------------------------------------------------------------------------#
-WORKFLOW_TESTS = TestLoader().loadTestsFromTestCase(WorkflowTests)
-GET_DATA_FRAME = TestLoader().loadTestsFromTestCase(GetDataFrame)
-EXPORT = TestLoader().loadTestsFromTestCase(Export)
-EXTRA_PAIRS = TestLoader().loadTestsFromTestCase(ExtraPairs)
-SETTINGS = TestLoader().loadTestsFromTestCase(Settings)
-OUTPUT = TestLoader().loadTestsFromTestCase(Output)
-AUX_METHODS = TestLoader().loadTestsFromTestCase(AuxiliaryExperimentMethods)
-MAKE_HISTOGRAM = TestLoader().loadTestsFromTestCase(MakeHistogram)
-MAKE_LILYPOND = TestLoader().loadTestsFromTestCase(MakeLilyPond)
+_LOADER = TestLoader()
+WORKFLOW_TESTS = _LOADER.loadTestsFromTestCase(WorkflowTests)
+GET_DATA_FRAME = _LOADER.loadTestsFromTestCase(GetDataFrame)
+EXPORT = _LOADER.loadTestsFromTestCase(Export)
+EXTRA_PAIRS = _LOADER.loadTestsFromTestCase(ExtraPairs)
+SETTINGS = _LOADER.loadTestsFromTestCase(Settings)
+OUTPUT = _LOADER.loadTestsFromTestCase(Output)
+AUX_METHODS = _LOADER.loadTestsFromTestCase(AuxiliaryExperimentMethods)
+MAKE_HISTOGRAM = _LOADER.loadTestsFromTestCase(MakeHistogram)
+MAKE_LILYPOND = _LOADER.loadTestsFromTestCase(MakeLilyPond)
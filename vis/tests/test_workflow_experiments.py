@@ -223,6 +223,18 @@ class IntervalNGrams(TestCase):
         self.assertEqual(expected, actual)
         self.assertSequenceEqual(expected, test_wm._result)
 
+    @mock.patch(u'vis.workflow.ast.literal_eval')
+    @mock.patch(u'vis.workflow.WorkflowManager._run_freq_agg')
+    @mock.patch(u'vis.workflow.WorkflowManager._variable_part_modules')
+    def test_interval_ngrams_3(self, mock_var, mock_rfa, mock_eval):
+        # --> that "voice combinations" given as a list are used without parsing a string
+        test_wm = WorkflowManager([MagicMock(spec=IndexedPiece)])
+        test_wm.settings(0, u'voice combinations', [[0, 1]])
+        test_wm._interval_ngrams()
+        mock_var.assert_called_once_with(0)
+        mock_rfa.assert_called_once_with()
+        self.assertEqual(0, mock_eval.call_count)
+
     @mock.patch(u'vis.workflow.WorkflowManager._run_off_rep')
     @mock.patch(u'vis.workflow.interval.HorizontalIntervalIndexer')
     @mock.patch(u'vis.workflow.ngram.NGramIndexer')
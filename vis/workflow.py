@@ -32,13 +32,85 @@ new ``WorkflowManager`` classes.
 
 from os import path
 import ast
+import multiprocessing
 import subprocess
 import pandas
 import vis
 from vis.models import indexed_piece
-from vis.models.aggregated_pieces import AggregatedPieces
 from vis.analyzers.indexers import noterest, interval, ngram, offset, repeat, lilypond
-from vis.analyzers.experimenters import frequency, aggregator
+
+# Used by WorkflowManager._EXPORT_FORMATS: pandas writes Excel files much faster with XlsxWriter
+# than with its default openpyxl engine, so use XlsxWriter when it's installed.
+try:
+    import xlsxwriter  # pylint: disable=unused-import
+    _EXCEL_KWARGS = {u'engine': u'xlsxwriter'}
+except ImportError:
+    _EXCEL_KWARGS = {}
+
+
+def _import_piece(piece):
+    """
+    Import a piece and run the :class:`~vis.analyzers.indexers.noterest.NoteRestIndexer` on it.
+    Used internally by :meth:`WorkflowManager.load` as the worker function for its process pool.
+
+    :param piece: The piece to import.
+    :type piece: :class:`~vis.models.indexed_piece.IndexedPiece`
+
+    :returns: The imported piece or, if the file imports as a :class:`music21.stream.Opus`, a new
+        :class:`IndexedPiece` for each :class:`Score` in it, which is what
+        :meth:`WorkflowManager.load` would otherwise make itself.
+    :rtype: :class:`~vis.models.indexed_piece.IndexedPiece` or list of
+        :class:`~vis.models.indexed_piece.IndexedPiece`
+    """
+    try:
+        piece.get_data([noterest.NoteRestIndexer])
+    except indexed_piece.OpusWarning:
+        return piece.get_data([noterest.NoteRestIndexer], known_opus=True)
+    return piece
+
+
+def _voice_combinations(value):
+    """
+    Interpret a value of the ``voice combinations`` setting. Used internally by the
+    :class:`WorkflowManager` methods that need the voice combinations.
+
+    :param value: The setting's value: a list of voice combinations, a ``basestring`` that
+        represents one, or one of the special values ``u'all'`` and ``u'all pairs'``.
+    :type value: list of list of int or basestring
+
+    :returns: ``value`` itself if it is already a list or one of the special values; otherwise the
+        object ``value`` represents.
+    :rtype: list of list of int or basestring
+
+    :raises: :exc:`ValueError` if ``value`` is a ``basestring`` that does not represent a Python
+        literal.
+    """
+    if not isinstance(value, basestring) or value in (u'all', u'all pairs'):
+        return value
+    return ast.literal_eval(value)
+
+
+# Used by WorkflowManager._import_in_pool(): the IndexedPiece attributes that _import_piece() fills
+# in a worker process, and that are copied back to the IndexedPiece held by the WorkflowManager.
+_IMPORTED_ATTRS = (u'_imported', u'_metadata', u'_noterest_results')
+
+
+def _file_size(piece):
+    """
+    Find the size of a piece's file, as an estimate of how long it takes to import. Used internally
+    by :meth:`WorkflowManager._import_in_pool` to hand out the largest files first.
+
+    :param piece: The piece.
+    :type piece: :class:`~vis.models.indexed_piece.IndexedPiece`
+
+    :returns: The size of the file in bytes, or ``0`` if it cannot be found (including when the
+        ``pathname`` metadatum is not a string).
+    :rtype: int
+    """
+    try:
+        return path.getsize(piece.metadata(u'pathname'))
+    except (OSError, TypeError):
+        return 0
 
 
 class WorkflowManager(object):
@@ -79,10 +151,11 @@ class WorkflowManager(object):
     # - self._previous_exp: name of the experiments whose results are stored in self._result
     # - self._loaded: whether the load() method has been called
     # - self._R_bar_chart_path: path to the R-language script that makes bar charts
+    # - self._dataframe_cache: the results of _get_dataframe() for the current self._result
 
-    # names of the experiments available through run()
-    # NOTE: do not re-order these, or run() will break
-    _experiments_list = [u'intervals', u'interval n-grams']
+    # names of the experiments available through run(), each with the name of the method that
+    # runs it; run() chooses the first experiment whose name begins the instruction
+    _experiments_list = [(u'intervals', u'_intervs'), (u'interval n-grams', u'_interval_ngrams')]
 
     # Error message when users call output() with LilyPond, but they probably called run() with
     # ``count frequency`` set to True.
@@ -92,6 +165,24 @@ class WorkflowManager(object):
     # The error when we required two-voice pairs, but one of the combinations wasn't a pair.
     _REQUIRE_PAIRS_ERROR = u'All voice combinations must have two parts (found %s).'
 
+    # Used by export() and load() for HDF5 files: the key of the results in the HDF5 store.
+    _HDF5_KEY = u'vis_result'
+
+    # Used by _make_histogram(): the token that tells R_bar_chart.r what kind of results it plots,
+    # for each experiment; None means the results are n-grams, so the token is the value of "n"
+    _R_TOKENS = {u'intervals': u'int', u'n-grams': None}
+
+    # Used by export(): key is the format; value is (extension, DataFrame method, keyword arguments)
+    _EXPORT_FORMATS = {u'CSV': (u'.csv', u'to_csv', {}),
+                       u'Stata': (u'.dta', u'to_stata', {}),
+                       u'Excel': (u'.xlsx', u'to_excel', _EXCEL_KWARGS),
+                       u'HTML': (u'.html', u'to_html', {}),
+                       # NB: PyTables only accepts a str, not unicode, for "complib"
+                       u'HDF5': (u'.h5', u'to_hdf', {u'key': _HDF5_KEY,
+                                                     u'mode': 'w',
+                                                     u'complib': 'blosc',
+                                                     u'complevel': 5})}
+
     def __init__(self, pathnames):
         # create the list of IndexedPiece objects
         self._data = []
@@ -119,6 +210,8 @@ class WorkflowManager(object):
         self._loaded = False
         # calculate the bar chart script's path
         self._R_bar_chart_path = path.join(vis.__path__[0], 'scripts', 'R_bar_chart.r')
+        # the results of _get_dataframe(), as (self._result, {arguments: DataFrame})
+        self._dataframe_cache = (None, {})
 
     def __len__(self):
         """
@@ -132,7 +225,7 @@ class WorkflowManager(object):
         """
         return self._data[index]
 
-    def load(self, instruction='pieces', pathname=None):
+    def load(self, instruction='pieces', pathname=None, n_procs=None):
         """
         Import analysis data from long-term storage on a filesystem. This should primarily be \
         used for the ``u'pieces'`` instruction, to control when the initial music21 import \
@@ -149,38 +242,92 @@ class WorkflowManager(object):
         :parameter pathname: The pathname of the data to import; not required for the \
             ``u'pieces'`` instruction.
         :type pathname: basestring
+        :parameter n_procs: For the ``u'pieces'`` instruction, the number of processes that import
+            pieces at the same time. The default is the number of CPUs. Use ``1`` to import every
+            piece in this process. The pieces are sent to the worker processes with :mod:`pickle`,
+            so with more than one process, every :class:`IndexedPiece` must be picklable (a
+            :class:`~mock.MagicMock` standing in for one is not).
+        :type n_procs: int
 
         :raises: :exc:`RuntimeError` if the ``instruction`` is not recognized.
+        :raises: :exc:`RuntimeError` if the ``instruction`` requires a ``pathname`` but it is
+            ``None``.
 
         **Instructions**
 
-        .. note:: only ``u'pieces'`` is implemented at this time.
+        .. note:: only ``u'pieces'`` and ``u'hdf5'`` are implemented at this time.
 
         * ``u'pieces'``, to import all pieces, collect metadata, and run :class:`NoteRestIndexer`
-        * ``u'hdf5'`` to load data from a previous :meth:`export`.
+        * ``u'hdf5'`` to load results from a previous :meth:`export` in the ``u'HDF5'`` format.
         * ``u'stata'`` to load data from a previous :meth:`export`.
         * ``u'pickle'`` to load data from a previous :meth:`export`.
         """
         # TODO: remove requirement to provide "instruction"; should default to 'pieces'
-        # TODO: rewrite this with multiprocessing
-        # NOTE: you may want to have the worker process create a new IndexedPiece object, import it
-        #       and run the NoteRestIndexer, then pickle it and send that to a callback method
-        #       that will somehow unpickle it and replace the *data in* the IndexedPieces here, but
-        #       not actually replace the IndexedPieces, since that would inadvertently cancel the
-        #       client's pointer to the IndexedPieces, if they have one
         if u'pieces' == instruction:
+            if n_procs is None:
+                n_procs = multiprocessing.cpu_count()
+            opus_pieces = {}
+            if n_procs > 1 and len(self._data) > 1:
+                opus_pieces = self._import_in_pool(n_procs)
+            # pieces imported by the pool return their cached NoteRestIndexer results here; Opus
+            # files already expanded by the pool aren't imported again
             for i, piece in enumerate(self._data):
-                try:
-                    piece.get_data([noterest.NoteRestIndexer])
-                except indexed_piece.OpusWarning:
-                    new_ips = piece.get_data([noterest.NoteRestIndexer], known_opus=True)
-                    self._data = self._data[:i] + self._data[i + 1:] + new_ips
-        elif u'hdf5' == instruction or u'stata' == instruction or u'pickle' == instruction:
+                if id(piece) in opus_pieces:
+                    new_ips = opus_pieces[id(piece)]
+                else:
+                    try:
+                        piece.get_data([noterest.NoteRestIndexer])
+                        continue
+                    except indexed_piece.OpusWarning:
+                        new_ips = piece.get_data([noterest.NoteRestIndexer], known_opus=True)
+                self._data = self._data[:i] + self._data[i + 1:] + new_ips
+        elif u'hdf5' == instruction:
+            if pathname is None:
+                raise RuntimeError(u'The "hdf5" instruction requires a pathname.')
+            self._result = pandas.read_hdf(pathname, WorkflowManager._HDF5_KEY)
+        elif u'stata' == instruction or u'pickle' == instruction:
             raise NotImplementedError(u'The ' + instruction + u' instruction does\'t work yet!')
         else:
             raise RuntimeError(u'Unrecognized load() instruction: "' + unicode(instruction) + '"')
         self._loaded = True
 
+    def _import_in_pool(self, n_procs):
+        """
+        Import every piece and run the :class:`~vis.analyzers.indexers.noterest.NoteRestIndexer`
+        on it, sharing the pieces between worker processes. Used internally by :meth:`load`.
+
+        The imported metadata and :class:`NoteRestIndexer` results are copied into the
+        :class:`IndexedPiece` objects already held here, rather than replacing them, so a client's
+        references to them stay valid. Pieces that import as a :class:`music21.stream.Opus` are
+        left untouched; the worker expands them into new :class:`IndexedPiece` objects, which are
+        returned for :meth:`load` to use, so no file is imported again in this process.
+
+        The largest files are handed out first, so that a worker given a big file near the end of
+        the batch doesn't leave the others waiting for it.
+
+        :param n_procs: The number of worker processes.
+        :type n_procs: int
+
+        :returns: The new :class:`IndexedPiece` objects for each piece that imports as an
+            :class:`Opus`, keyed on the id() of that piece.
+        :rtype: dict of list of :class:`~vis.models.indexed_piece.IndexedPiece`
+        """
+        pieces = sorted(self._data, key=_file_size, reverse=True)
+        pool = multiprocessing.Pool(min(n_procs, len(pieces)))
+        try:
+            imported = pool.map(_import_piece, pieces, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+        opus_pieces = {}
+        for piece, new_piece in zip(pieces, imported):
+            if isinstance(new_piece, list):
+                opus_pieces[id(piece)] = new_piece
+            else:
+                for attr in _IMPORTED_ATTRS:
+                    setattr(piece, attr, getattr(new_piece, attr))
+        return opus_pieces
+
     def run(self, instruction):
         """
         Run an experiment's workflow. Remember to call :meth:`load` before this method.
@@ -217,21 +364,14 @@ class WorkflowManager(object):
 
         if self._loaded is not True:
             raise RuntimeError(u'Please call load() before you call run()')
-        error_msg = u'WorkflowManager.run() could not parse the instruction'
-        post = None
         # run the experiment
-        if len(instruction) < min([len(x) for x in WorkflowManager._experiments_list]):
-            raise RuntimeError(error_msg)
-        if instruction.startswith(WorkflowManager._experiments_list[0]):
-            # intervals
-            self._previous_exp = WorkflowManager._experiments_list[0]
-            post = self._intervs()
-        elif instruction.startswith(WorkflowManager._experiments_list[1]):
-            # interval n-grams
-            self._previous_exp = WorkflowManager._experiments_list[1]
-            post = self._interval_ngrams()
+        for exp_name, exp_method in WorkflowManager._experiments_list:
+            if instruction.startswith(exp_name):
+                self._previous_exp = exp_name
+                post = getattr(self, exp_method)()
+                break
         else:
-            raise RuntimeError(error_msg)
+            raise RuntimeError(u'WorkflowManager.run() could not parse the instruction')
         if was_dynamic_quality:
             self.settings(None, 'continuer', 'dynamic quality')
         self._result = post
@@ -269,13 +409,10 @@ class WorkflowManager(object):
         for i in xrange(len(self._data)):
             # figure out which combinations we need... this might raise a ValueError, but there's
             # not much we can do to save the situation, so we might as well let it go up
-            combos = unicode(self.settings(i, u'voice combinations'))
-            if combos != u'all' and combos != u'all pairs':
-                combos = ast.literal_eval(combos)
-
-            if u'all' == self.settings(i, u'voice combinations'):
+            combos = _voice_combinations(self.settings(i, u'voice combinations'))
+            if u'all' == combos:
                 self._result.append(self._all_part_modules(i))
-            elif u'all pairs' == self.settings(i, u'voice combinations'):
+            elif u'all pairs' == combos:
                 self._result.append(self._two_part_modules(i))
             else:
                 self._result.append(self._variable_part_modules(i))
@@ -318,20 +455,21 @@ class WorkflowManager(object):
         horiz_ints = self._run_off_rep(index, horiz_ints, is_horizontal=True)
         # figure out which combinations we need... this might raise a ValueError, but there's not
         # much we can do to save the situation, so we might as well let it go up
-        needed_combos = ast.literal_eval(unicode(self.settings(index, u'voice combinations')))
+        needed_combos = _voice_combinations(self.settings(index, u'voice combinations'))
+        # the NGramIndexer settings that are the same for every combination
+        ngram_setts = self._ngram_settings()
         # each key in vert_ints corresponds to a two-voice combination we should use
         post = []
         for combo in needed_combos:
+            # the last part in a combination is the lower (horizontal) part
+            upper, lowest = combo[:-1], combo[-1]
             # make the list of parts
-            parts = [vert_ints[str(i) + u',' + str(combo[-1])] for i in combo[:-1]]
-            parts.append(horiz_ints[combo[-1]])
+            parts = [vert_ints[u'%s,%s' % (i, lowest)] for i in upper]
+            parts.append(horiz_ints[lowest])
             # assemble settings
-            setts = {u'vertical': range(len(combo[:-1])), u'horizontal': [len(combo[:-1])]}
-            setts[u'mark singles'] = self.settings(None, u'mark singles')
-            setts[u'continuer'] = self.settings(None, u'continuer')
-            setts[u'n'] = self.settings(None, u'n')
-            if self.settings(None, u'include rests') is not True:
-                setts[u'terminator'] = u'Rest'
+            setts = dict(ngram_setts)
+            setts[u'vertical'] = range(len(upper))
+            setts[u'horizontal'] = [len(upper)]
             # run NGramIndexer, then append the result to the corresponding index of the dict
             post.append(piece.get_data([ngram.NGramIndexer], setts, parts)[0])
         return post
@@ -365,6 +503,8 @@ class WorkflowManager(object):
         # run the offset and repeat indexers, if required
         vert_ints = self._run_off_rep(index, vert_ints)
         horiz_ints = self._run_off_rep(index, horiz_ints, is_horizontal=True)
+        # the NGramIndexer settings that are the same for every combination
+        ngram_setts = self._ngram_settings()
         # each key in vert_ints corresponds to a two-voice combination we should use
         post = []
         for combo in vert_ints.iterkeys():
@@ -373,12 +513,9 @@ class WorkflowManager(object):
             # make the list of parts
             parts = [vert_ints[combo], horiz_ints[horiz_i]]
             # assemble settings
-            setts = {u'vertical': [0], u'horizontal': [1]}
-            setts[u'mark singles'] = self.settings(None, u'mark singles')
-            setts[u'continuer'] = self.settings(None, u'continuer')
-            setts[u'n'] = self.settings(None, u'n')
-            if self.settings(None, u'include rests') is not True:
-                setts[u'terminator'] = u'Rest'
+            setts = dict(ngram_setts)
+            setts[u'vertical'] = [0]
+            setts[u'horizontal'] = [1]
             # run NGramIndexer, then append the result to the corresponding index of the dict
             post.append(piece.get_data([ngram.NGramIndexer], setts, parts)[0])
         return post
@@ -417,21 +554,36 @@ class WorkflowManager(object):
         horiz_ints = self._run_off_rep(index, horiz_ints, is_horizontal=True)
         # figure out the weird string-index things for the vertical part combos
         lowest_part = len(piece.metadata(u'parts')) - 1
-        vert_combos = [str(x) + u',' + str(lowest_part) for x in xrange(lowest_part)]
+        vert_combos = [u'%s,%s' % (x, lowest_part) for x in xrange(lowest_part)]
         # make the list of parts
         parts = [vert_ints[x] for x in vert_combos]
         parts.append(horiz_ints[-1])  # always the lowest voice
         # assemble settings
-        setts = {u'vertical': range(len(parts) - 1), u'horizontal': [len(parts) - 1]}
-        setts[u'mark singles'] = self.settings(None, u'mark singles')
-        setts[u'continuer'] = self.settings(None, u'continuer')
-        setts[u'n'] = self.settings(None, u'n')
-        if self.settings(None, u'include rests') is not True:
-            setts[u'terminator'] = u'Rest'
+        setts = self._ngram_settings()
+        setts[u'vertical'] = range(len(parts) - 1)
+        setts[u'horizontal'] = [len(parts) - 1]
         # run NGramIndexer, then append the result to the corresponding index of the dict
         result = [piece.get_data([ngram.NGramIndexer], setts, parts)[0]]
         return result
 
+    def _ngram_settings(self):
+        """
+        Make the :class:`~vis.analyzers.indexers.ngram.NGramIndexer` settings that come from the
+        shared settings, and are therefore the same for every piece and voice combination. Used
+        internally by :meth:`_variable_part_modules`, :meth:`_two_part_modules`, and
+        :meth:`_all_part_modules`, which add the ``u'vertical'`` and ``u'horizontal'`` settings.
+
+        :returns: The ``u'mark singles'``, ``u'continuer'``, and ``u'n'`` settings, plus
+            ``u'terminator'`` if rests are not included.
+        :rtype: dict
+        """
+        shared = self._shared_settings
+        post = {u'mark singles': shared[u'mark singles'], u'continuer': shared[u'continuer'],
+                u'n': shared[u'n']}
+        if shared[u'include rests'] is not True:
+            post[u'terminator'] = u'Rest'
+        return post
+
     def _intervs(self):
         """
         Prepare a list of the intervals found between two parts in all pieces. If particular voice
@@ -460,13 +612,13 @@ class WorkflowManager(object):
         setts = {u'quality': self.settings(None, u'interval quality')}
         setts[u'simple or compound'] = u'simple' if self.settings(None, u'simple intervals') \
                                        is True else u'compound'
+        include_rests = self.settings(None, u'include rests')
         for i, piece in enumerate(self._data):
             vert_ints = piece.get_data([noterest.NoteRestIndexer, interval.IntervalIndexer], setts)
             # figure out which combinations we need... this might raise a ValueError, but there's
             # not much we can do to save the situation, so we might as well let it go up
-            combos = unicode(self.settings(i, u'voice combinations'))
-            if combos != u'all' and combos != u'all pairs' and combos != u'None':
-                combos = ast.literal_eval(combos)
+            combos = _voice_combinations(self.settings(i, u'voice combinations'))
+            if combos is not None and combos != u'all' and combos != u'all pairs':
                 # ensure each combination is a two-voice pair
                 for pair in combos:
                     if 2 != len(pair):
@@ -477,10 +629,10 @@ class WorkflowManager(object):
             # run the offset and repeat indexers, if required
             post = self._run_off_rep(i, vert_ints)
             # remove the "Rest" entries, if required
-            if self.settings(None, u'include rests') is not True:
-                # we'll just get a view that omits the "Rest" entries in the Series
-                for i, pair in enumerate(post):
-                    post[i] = pair[pair != u'Rest']
+            if include_rests is not True:
+                # we'll just get a view that omits the "Rest" entries in the Series; comparing the
+                # underlying ndarray skips building an intermediate boolean Series for each pair
+                post = [pair[pair.values != u'Rest'] for pair in post]
             self._result.append(post)
         if self.settings(None, 'count frequency') is True:
             self._run_freq_agg()
@@ -518,38 +670,46 @@ class WorkflowManager(object):
         dict_keys = so_far.keys() if isinstance(so_far, dict) else None
         if dict_keys is not None:  # dict-to-list in a known order
             so_far = [so_far[key] for key in dict_keys]
-        if self.settings(index, u'offset interval') is not None:
-            off_sets = {'quarterLength': self.settings(index, 'offset interval')}
+        off_interval = self.settings(index, u'offset interval')
+        if off_interval is not None:
+            off_sets = {'quarterLength': off_interval}
             if is_horizontal:
                 off_sets['method'] = None
             so_far = self._data[index].get_data([offset.FilterByOffsetIndexer], off_sets, so_far)
         if self.settings(index, u'filter repeats') is True:
             so_far = self._data[index].get_data([repeat.FilterByRepeatIndexer], {}, so_far)
         if dict_keys is not None:  # known-order-list-to-dict
-            so_far = {dict_keys[i]: so_far[i] for i in xrange(len(dict_keys))}
+            so_far = dict(zip(dict_keys, so_far))
         return so_far
 
     def _run_freq_agg(self):
         """
-        Run the frequency and aggregation experimenters:
+        Count the occurrences of every object in every voice combination of every piece. The
+        counts are the same as running these experimenters with :class:`AggregatedPieces`, but
+        everything is counted in a single pass:
 
-        * :class:`~vis.analyzers.experimenters.frequencyFrequencyExperimenter`
+        * :class:`~vis.analyzers.experimenters.frequency.FrequencyExperimenter`
         * :class:`~vis.analyzers.experimenters.aggregator.ColumnAggregator`
 
         Use this method from other :class:`WorkflowManager` methods for counting frequency.
 
         .. note:: This method runs on, then overwrites, values stored in :attr:`self._result`.
 
-        :returns: Aggregated frequency counts for everything stored in :attr:`self._result`.
+        :returns: Aggregated frequency counts for everything stored in :attr:`self._result`, from
+            most to least frequent.
         :rtype: :class:`pandas.Series`
         """
-        # NB: there's no "logic" here, so I didn't bother testing the method
-        agg_p = AggregatedPieces(self._data)
-        self._result = agg_p.get_data([aggregator.ColumnAggregator],
-                                      [frequency.FrequencyExperimenter],
-                                      {},
-                                      self._result)
-        self._result.sort(ascending=False)
+        all_series = []
+        for piece_result in self._result:
+            if isinstance(piece_result, dict):
+                all_series.extend(piece_result.itervalues())
+            else:
+                all_series.extend(piece_result)
+        if 0 == len(all_series):
+            self._result = pandas.Series()
+        else:
+            # value_counts() leaves out NaN and sorts from most to least frequent
+            self._result = pandas.concat(all_series, ignore_index=True).value_counts()
         return self._result
 
     @staticmethod
@@ -559,30 +719,23 @@ class WorkflowManager(object):
         a separate function to improve test-ability.
 
         **Parameters:**
-        :param vert_ints: The results of IntervalIndexer.
-        :type vert_ints: dict of any
+        :param vert_ints: The results of IntervalIndexer, either as the :class:`DataFrame` it
+            returns (with the voice pair as the second level of the column index) or as a dict
+            with voice pairs as keys.
+        :type vert_ints: :class:`pandas.DataFrame` or dict of any
         :param combos: The voice pairs to keep. Note that any element in this list longer than 2
             will be silently ignored.
         :type combos: list of list of int
 
         **Returns:**
-        :returns: Only the voice pairs you want.
-        :rtype: dict of any
-        """
-        these_pairs = []
-        for pair in combos:
-            if 2 == len(pair):
-                these_pairs.append(unicode(pair[0]) + u',' + unicode(pair[1]))
-        if 0 == len(these_pairs):
-            return {}
-        else:
-            delete_these = []
-            for key in vert_ints.iterkeys():
-                if key not in these_pairs:
-                    delete_these.append(key)
-            for key in delete_these:
-                del vert_ints[key]
-            return vert_ints
+        :returns: Only the voice pairs you want, in a new object of the same type; ``vert_ints``
+            is not modified.
+        :rtype: :class:`pandas.DataFrame` or dict of any
+        """
+        these_pairs = set(u'%s,%s' % (pair[0], pair[1]) for pair in combos if 2 == len(pair))
+        if isinstance(vert_ints, pandas.DataFrame):
+            return vert_ints.loc[:, [col[1] in these_pairs for col in vert_ints.columns]]
+        return {key: val for key, val in vert_ints.iteritems() if key in these_pairs}
 
     def _get_dataframe(self, name=u'data', top_x=None, threshold=None):
         """
@@ -600,7 +753,17 @@ class WorkflowManager(object):
 
         :returns: A DataFrame with self._result as the only column.
         :rtype: :class:`DataFrame`
+
+        .. note:: Until ``self._result`` is replaced, calling this method again with the same
+            arguments returns the same :class:`DataFrame`, so callers must not modify it. This
+            lets :meth:`output` and :meth:`export` share the work when called one after another.
         """
+        if self._dataframe_cache[0] is not self._result:
+            self._dataframe_cache = (self._result, {})
+        cache = self._dataframe_cache[1]
+        args = (name, top_x, threshold)
+        if args in cache:
+            return cache[args]
         post = None
         if threshold is not None:
             post = self._result[self._result > threshold]
@@ -608,7 +771,9 @@ class WorkflowManager(object):
             post = self._result
         if top_x is not None:
             post = post[:top_x]
-        return pandas.DataFrame({name: post})
+        post = pandas.DataFrame({name: post})
+        cache[args] = post
+        return post
 
     def output(self, instruction, pathname=None, top_x=None, threshold=None):
         """
@@ -682,18 +847,12 @@ class WorkflowManager(object):
         stata_path = pathname + u'.dta'
         png_path = pathname + u'.png'
         # ensure we have a DataFrame
-        if not isinstance(self._result, pandas.DataFrame):
-            out_me = self._get_dataframe(u'freq', top_x, threshold)
-        else:
-            out_me = self._result
+        out_me = self._result if isinstance(self._result, pandas.DataFrame) \
+            else self._get_dataframe(u'freq', top_x, threshold)
         out_me.to_stata(stata_path)
-        token = None
-        if u'intervals' == self._previous_exp:
-            token = u'int'
-        elif u'n-grams' == self._previous_exp:
+        token = WorkflowManager._R_TOKENS.get(self._previous_exp, u'things')
+        if token is None:
             token = unicode(self.settings(None, u'n'))
-        else:
-            token = u'things'
         call_to_r = [u'Rscript', u'--vanilla', self._R_bar_chart_path,
                      stata_path, png_path, token, str(len(self._data))]
         try:
@@ -731,7 +890,7 @@ class WorkflowManager(object):
                     for right in xrange(left + 1, len(self.metadata(i, 'parts'))):
                         combos.append([left, right])
             else:
-                combos = ast.literal_eval(self.settings(i, 'voice combinations'))
+                combos = _voice_combinations(self.settings(i, 'voice combinations'))
             #for j in xrange(len(self._result[i])):
             sorted_parts = self._result[i].columns
             sorted_parts = sorted(sorted_parts, key=lambda x: x[1])
@@ -785,31 +944,28 @@ class WorkflowManager(object):
         * ``u'Stata'``: output a Stata file for importing to R.
         * ``u'Excel'``: output an Excel file for Peter Schubert.
         * ``u'HTML'``: output an HTML table, as used by the vis PyQt4 GUI.
+        * ``u'HDF5'``: output a compressed HDF5 file that :meth:`load` can read again. Requires \
+            PyTables.
         """
         # TODO: merge export() functionality into output() (as a private method)
         # ensure we have some results
         if self._result is None:
             raise RuntimeError(u'Call run() before calling export()')
         # ensure we have a DataFrame
-        if not isinstance(self._result, pandas.DataFrame):
-            export_me = self._get_dataframe(u'data', top_x, threshold)
-        else:
-            export_me = self._result
-        # key is the instruction; value is (extension, export_method)
-        directory = {u'CSV': (u'.csv', export_me.to_csv),
-                     u'Stata': (u'.dta', export_me.to_stata),
-                     u'Excel': (u'.xlsx', export_me.to_excel),
-                     u'HTML': (u'.html', export_me.to_html)}
+        export_me = self._result if isinstance(self._result, pandas.DataFrame) \
+            else self._get_dataframe(u'data', top_x, threshold)
         # ensure we have a valid output format
-        if form not in directory:
+        try:
+            ext, method_name, kwargs = WorkflowManager._EXPORT_FORMATS[form]
+        except KeyError:
             raise RuntimeError(u'Unrecognized output format: ' + unicode(form))
         # ensure we have an output path
         pathname = u'test_output/no_path' if pathname is None else unicode(pathname)
         # ensure there's a file extension
-        if directory[form][0] != pathname[-1 * len(directory[form][0]):]:
-            pathname += directory[form][0]
+        if not pathname.endswith(ext):
+            pathname += ext
         # call the to_whatever() method
-        directory[form][1](pathname)
+        getattr(export_me, method_name)(pathname, **kwargs)
         return pathname
 
     def metadata(self, index, field, value=None):
@@ -879,8 +1035,8 @@ class WorkflowManager(object):
             set this setting to a list of a list of iterables. The following value would analyze \
             the highest three voices with each other: ``'[[0,1,2]]'`` while this would analyze the \
             every part with the lowest for a four-part piece: ``'[[0, 3], [1, 3], [2, 3]]'``. This \
-            should always be a ``basestring`` that nominally represents a list (except the special \
-            values for ``'all'`` parts at once or ``'all pairs'``).
+            may be the list itself or a ``basestring`` that nominally represents it (except the \
+            special values for ``'all'`` parts at once or ``'all pairs'``); a list is used as-is.
 
         **Shared Settings**
 
@@ -914,8 +1070,13 @@ class WorkflowManager(object):
             if value is None:
                 raise ValueError(u'If "index" is None, "value" must not be None.')
             else:
-                for i in xrange(len(self._settings)):
-                    self.settings(i, field, value)
+                # every piece has the same settings, so checking the first is enough
+                if self._settings and field not in self._settings[0]:
+                    raise AttributeError(u'Invalid setting: ' + unicode(field))
+                if field == u'offset interval' and value == 0:  # can't set directly to None :(
+                    value = None
+                for piece_settings in self._settings:
+                    piece_settings[field] = value
         elif not 0 <= index < len(self._settings):
             raise IndexError(u'Invalid piece index :' + unicode(index))
         elif field not in self._settings[index]: